@@ -0,0 +1,249 @@
+'''
+Набор бенчмарков для горячих путей лабораторной работы 1 (Angle, AngleRange и производные структуры)
+
+Для каждого случая и размера n выводится: операций в секунду, нс на операцию,
+созданных объектов Angle/AngleRange на операцию и пик памяти (tracemalloc) на операцию.
+Число объектов и память меряются на подвыборке (--alloc-sample), время - на полном n.
+
+Запуск:
+    python benchmark.py                          # размеры 10^3..10^5
+    python benchmark.py --scales 1e3 1e7         # свои размеры
+    python benchmark.py --filter range. --json out.json
+    python benchmark.py --compare old.json       # сравнение с сохраненным прогоном
+'''
+
+from __future__ import annotations
+import argparse
+import contextlib
+import json
+import math
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Iterator
+
+from main import (Angle, AngleArray, AngleRange, AngleRangeIndex, AngleRangeSet, BinaryAngle, TrigTable,
+                  merge_range_stream)
+
+
+class ObjectCounter:
+    '''Считает создание объектов Angle и AngleRange (подмена __init__/_setup на время замера)'''
+
+    def __init__(self) -> None:
+        self.angles = 0
+        self.ranges = 0
+
+    @contextlib.contextmanager
+    def watch(self) -> Iterator['ObjectCounter']:
+        angle_init = Angle.__init__
+        range_setup = AngleRange._setup
+
+        def counted_angle_init(obj, *args, **kwargs):
+            self.angles += 1
+            angle_init(obj, *args, **kwargs)
+
+        def counted_range_setup(obj, *args, **kwargs):
+            self.ranges += 1
+            range_setup(obj, *args, **kwargs)
+
+        Angle.__init__ = counted_angle_init
+        AngleRange._setup = counted_range_setup
+        try:
+            yield self
+        finally:
+            Angle.__init__ = angle_init
+            AngleRange._setup = range_setup
+
+
+def legacy_intersects(r1: AngleRange, r2: AngleRange) -> bool:
+    '''Проверка пересечения через разбиение на объекты AngleRange (до ядра на числах)'''
+    for sp in r1._split():
+        for op in r2._split():
+            if AngleRange._ranges_intersect(sp, op):
+                return True
+    return False
+
+
+# Генераторы данных
+def random_floats(n: int, rnd: random.Random) -> list[float]:
+    return [rnd.uniform(-20, 20) for _ in range(n)]
+
+
+def random_ranges(n: int, rnd: random.Random, max_width: float = 2 * math.pi,
+                  wrap: bool | None = None) -> list[AngleRange]:
+    '''Случайные диапазоны; wrap=True - только пересекающие 0, False - только не пересекающие'''
+    result = []
+    while len(result) < n:
+        start = rnd.uniform(0, 2 * math.pi)
+        rng = AngleRange(start, start + rnd.uniform(0, max_width), rnd.random() < 0.5, rnd.random() < 0.5)
+        if wrap is None or rng._crosses_zero == wrap:
+            result.append(rng)
+    return result
+
+
+@dataclass
+class Case:
+    '''Случай бенчмарка: setup готовит данные (не входит в замер), run выполняет n операций'''
+    name: str
+    setup: Callable[[int, random.Random], object]
+    run: Callable[[object], object]
+
+
+def _pairs(make: Callable[[int, random.Random], list]) -> Callable[[int, random.Random], tuple[list, list]]:
+    return lambda n, rnd: (make(n, rnd), make(n, rnd))
+
+
+CASES = [
+    # Angle
+    Case("angle.construct", random_floats, lambda xs: [Angle(x) for x in xs]),
+    Case("angle.add", _pairs(lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)]),
+         lambda ab: [a + b for a, b in zip(*ab)]),
+    Case("angle.mul", lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)],
+         lambda angles: [a * 2.5 for a in angles]),
+    Case("angle.eq", _pairs(lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)]),
+         lambda ab: [a == b for a, b in zip(*ab)]),
+    Case("angle.lt", _pairs(lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)]),
+         lambda ab: [a < b for a, b in zip(*ab)]),
+    Case("angle.sort", lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)],
+         lambda angles: sorted(angles)),
+    Case("angle.sort_key", lambda n, rnd: [Angle(x) for x in random_floats(n, rnd)],
+         lambda angles: sorted(angles, key=Angle.sort_key)),
+    # Тригонометрия: повторяющиеся пеленги (целые градусы)
+    Case("angle.sincos_libm", lambda n, rnd: [Angle(rnd.randrange(360), radians=False) for _ in range(n)],
+         lambda angles: [(math.sin(a.radians), math.cos(a.radians)) for a in angles]),
+    Case("angle.sincos", lambda n, rnd: [Angle(rnd.randrange(360), radians=False) for _ in range(n)],
+         lambda angles: [a.sincos() for a in angles]),
+    Case("angle.sincos_table", lambda n, rnd: ([Angle(rnd.randrange(360), radians=False) for _ in range(n)],
+                                               TrigTable(4096)),
+         lambda data: [a.sincos(data[1]) for a in data[0]]),
+    Case("angle_array.sincos", lambda n, rnd: AngleArray(random_floats(n, rnd)),
+         lambda arr: arr.sincos()),
+    # Пакетные и двоичные углы
+    Case("angle_array.add", _pairs(lambda n, rnd: AngleArray(random_floats(n, rnd))),
+         lambda ab: ab[0] + ab[1]),
+    Case("angle_array.less", _pairs(lambda n, rnd: AngleArray(random_floats(n, rnd))),
+         lambda ab: ab[0].less(ab[1])),
+    Case("binary_angle.add", _pairs(lambda n, rnd: [BinaryAngle.from_radians(x) for x in random_floats(n, rnd)]),
+         lambda ab: [a + b for a, b in zip(*ab)]),
+    # AngleRange
+    Case("range.construct", _pairs(random_floats),
+         lambda ab: [AngleRange(s, e) for s, e in zip(*ab)]),
+    Case("range.contains", lambda n, rnd: (random_ranges(n, rnd), random_floats(n, rnd)),
+         lambda data: [x in r for r, x in zip(*data)]),
+    Case("range.intersects_legacy", _pairs(random_ranges),
+         lambda ab: [legacy_intersects(a, b) for a, b in zip(*ab)]),
+    Case("range.intersects", _pairs(random_ranges),
+         lambda ab: [a._intersects(b) for a, b in zip(*ab)]),
+    Case("range.add", _pairs(random_ranges), lambda ab: [a + b for a, b in zip(*ab)]),
+    Case("range.sub", _pairs(random_ranges), lambda ab: [a - b for a, b in zip(*ab)]),
+    Case("range.add_wrap", _pairs(lambda n, rnd: random_ranges(n, rnd, wrap=True)),
+         lambda ab: [a + b for a, b in zip(*ab)]),
+    Case("range.sub_wrap", _pairs(lambda n, rnd: random_ranges(n, rnd, wrap=True)),
+         lambda ab: [a - b for a, b in zip(*ab)]),
+    Case("range.contains_wrap", lambda n, rnd: (random_ranges(n, rnd, wrap=True), random_floats(n, rnd)),
+         lambda data: [x in r for r, x in zip(*data)]),
+    # Структуры над наборами диапазонов (узкие сектора)
+    Case("range_set.build", lambda n, rnd: random_ranges(n, rnd, max_width=0.01),
+         lambda ranges: AngleRangeSet(ranges)),
+    Case("range_set.contains", lambda n, rnd: (AngleRangeSet(random_ranges(n, rnd, max_width=0.01)),
+                                               random_floats(n, rnd)),
+         lambda data: [x in data[0] for x in data[1]]),
+    Case("range_index.stab", lambda n, rnd: (AngleRangeIndex(random_ranges(n, rnd, max_width=0.01)),
+                                             random_floats(n, rnd)),
+         lambda data: [data[0].stab(x) for x in data[1]]),
+    Case("merge_stream", lambda n, rnd: random_ranges(n, rnd, max_width=0.01),
+         lambda ranges: sum(1 for _ in merge_range_stream(ranges, chunk_size=max(1, len(ranges) // 4)))),
+]
+
+
+@dataclass
+class Result:
+    case: str
+    n: int
+    seconds: float
+    ops_per_sec: float
+    ns_per_op: float
+    objects_per_op: float
+    peak_bytes_per_op: float
+
+
+def run_case(case: Case, n: int, alloc_sample: int, repeat: int, seed: int = 0) -> Result:
+    '''Время - лучшее из repeat прогонов на n операций; объекты и память - на подвыборке'''
+    data = case.setup(n, random.Random(seed))
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        case.run(data)
+        best = min(best, time.perf_counter() - start)
+
+    sample_n = min(n, alloc_sample)
+    sample = case.setup(sample_n, random.Random(seed))
+    counter = ObjectCounter()
+    with counter.watch():
+        case.run(sample)
+    tracemalloc.start()
+    case.run(sample)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return Result(case.name, n, best, n / best if best else math.inf, best / n * 1e9,
+                  (counter.angles + counter.ranges) / sample_n, peak / sample_n)
+
+
+def print_results(results: list[Result], baseline: dict[tuple[str, int], dict] | None = None) -> None:
+    header = f"{'случай':<26}{'n':>10}{'оп/с':>14}{'нс/оп':>11}{'объект/оп':>11}{'байт/оп':>10}"
+    if baseline is not None:
+        header += f"{'было нс/оп':>12}{'ускорение':>11}"
+    print(header)
+    for r in results:
+        line = (f"{r.case:<26}{r.n:>10}{r.ops_per_sec:>14,.0f}{r.ns_per_op:>11.0f}"
+                f"{r.objects_per_op:>11.2f}{r.peak_bytes_per_op:>10.0f}")
+        if baseline is not None:
+            old = baseline.get((r.case, r.n))
+            if old is None:
+                line += f"{'-':>12}{'-':>11}"
+            else:
+                line += f"{old['ns_per_op']:>12.0f}{old['ns_per_op'] / r.ns_per_op:>10.2f}x"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарки Angle/AngleRange")
+    parser.add_argument("--scales", nargs="+", type=float, default=[1e3, 1e4, 1e5],
+                        help="размеры n (например 1e3 1e7)")
+    parser.add_argument("--filter", default="", help="только случаи, имя которых содержит строку")
+    parser.add_argument("--repeat", type=int, default=3, help="число прогонов для замера времени")
+    parser.add_argument("--alloc-sample", type=int, default=10_000, help="размер подвыборки для объектов/памяти")
+    parser.add_argument("--json", help="сохранить результаты в JSON")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {(r["case"], r["n"]): r for r in json.load(f)["results"]}
+
+    results = []
+    for n in (int(s) for s in args.scales):
+        for case in CASES:
+            if args.filter in case.name:
+                results.append(run_case(case, n, args.alloc_sample, args.repeat))
+                print(f"  {case.name} n={n}: {results[-1].ns_per_op:.0f} нс/оп", file=sys.stderr)
+    print_results(results, baseline)
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": [asdict(r) for r in results],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -23,7 +23,23 @@
 '''
 
 from __future__ import annotations
+import bisect
+import collections
+import functools
+import heapq
+import itertools
 import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fractions import Fraction
+from typing import Iterable, Iterator
 FloatDivision = 1e-12
 
 
@@ -32,11 +48,14 @@ class Angle:
     """Класс для работы с углами"""
     """value - значение угла в радианах или градусах (int или flot)."""
     """radians - флаг, указывающий, что значение задано в радианах (True - радианы, False - градусы). По умолчанию True."""
+    __slots__ = ('_radians', '_norm')  # без __dict__; _norm - кэш нормализованного значения
+
     def __init__(self, value: float = 0, radians: bool = True) -> None: # инициализация класса
         if radians:
             self._radians = float(value)
         else:
             self._radians = math.radians(float(value))  # градусы в радианы
+        self._norm = None
 
     ######
     @property
@@ -62,20 +81,46 @@ class Angle:
     def set_radians(self, value: float) -> None:
         '''Значение угла в радианах'''
         self._radians = float(value)
+        self._norm = None  # сбрасываем кэш нормализации
 
     def set_degrees(self, value: float) -> None:
         '''Значение угла в градусах'''
         self._radians = math.radians(float(value))  # Конвертируем градусы в радианы и сохраняем
+        self._norm = None
 
     # нормализация угла
     def _normalized(self) -> float:
-        '''Возвращает нормализованное значение угла в диапазоне [0, 2π)'''
-        rad = self._radians % self._TWOPI
-        # Учитываем отрицательные углы
-        if rad < 0:
-            rad += self._TWOPI
+        '''Возвращает нормализованное значение угла в диапазоне [0, 2π) (вычисляется один раз)'''
+        rad = self._norm
+        if rad is None:
+            rad = self._radians % self._TWOPI
+            # Учитываем отрицательные углы
+            if rad < 0:
+                rad += self._TWOPI
+            self._norm = rad
         return rad
 
+    def sort_key(self) -> float:
+        '''Ключ сортировки с учетом периодичности: sorted(angles, key=Angle.sort_key)'''
+        return self._normalized()
+
+    def to_binary(self, bits: int = 32) -> 'BinaryAngle':
+        '''Преобразование в двоичное представление BinaryAngle'''
+        return BinaryAngle.from_radians(self._radians, bits)
+
+    # Тригонометрия (table - TrigTable; по умолчанию таблица из set_trig_table, изначально точный режим)
+    def sin(self, table: 'TrigTable | None' = None) -> float:
+        '''Синус угла'''
+        return (table or _default_trig).sin(self._radians)
+
+    def cos(self, table: 'TrigTable | None' = None) -> float:
+        '''Косинус угла'''
+        return (table or _default_trig).cos(self._radians)
+
+    def sincos(self, table: 'TrigTable | None' = None) -> tuple[float, float]:
+        '''Синус и косинус угла за один вызов'''
+        return (table or _default_trig).sincos(self._radians)
+
     # Методы преобразования типов
     def __float__(self) -> float:
         '''Преобразование во float'''
@@ -177,15 +222,550 @@ class Angle:
         return NotImplemented
 
 
+class AngleArray:
+    """Массив углов для пакетной арифметики (хранение в array('d'), в радианах)"""
+    """values - последовательность углов (float, int или Angle)."""
+    """radians - флаг, указывающий, что числа заданы в радианах (True - радианы, False - градусы). По умолчанию True."""
+    def __init__(self, values: Iterable[float | Angle] = (), radians: bool = True) -> None:
+        if isinstance(values, AngleArray):
+            data = array('d', values._data)
+        else:
+            # Angle уже хранит радианы, в градусах заданы только числа
+            to_radians = float if radians else lambda v: math.radians(float(v))
+            data = array('d', (v._radians if isinstance(v, Angle) else to_radians(v) for v in values))
+        self._data = data
+
+    @classmethod
+    def _wrap(cls, data: array) -> 'AngleArray':
+        '''Создание массива поверх готового array('d') без копирования'''
+        obj = cls.__new__(cls)
+        obj._data = data
+        return obj
+
+    @classmethod
+    def from_degrees(cls, values: Iterable[float]) -> 'AngleArray':
+        '''Создание массива из значений в градусах'''
+        return cls._wrap(array('d', map(math.radians, map(float, values))))
+
+    @property
+    def radians(self) -> array:
+        '''Значения углов в радианах (копия)'''
+        return array('d', self._data)
+
+    @property
+    def degrees(self) -> array:
+        '''Значения углов в градусах'''
+        return array('d', map(math.degrees, self._data))
+
+    # нормализация всего массива
+    def _normalized(self) -> array:
+        '''Нормализованные значения углов в диапазоне [0, 2π)'''
+        twopi = Angle._TWOPI
+        return array('d', [x % twopi for x in self._data])
+
+    def normalized(self) -> 'AngleArray':
+        '''Новый массив с нормализованными углами'''
+        return self._wrap(self._normalized())
+
+    def to_angles(self) -> list[Angle]:
+        '''Преобразование в список объектов Angle'''
+        return [Angle(x) for x in self._data]
+
+    # Пакетная тригонометрия (table - TrigTable, как у Angle.sin)
+    def sin(self, table: 'TrigTable | None' = None) -> array:
+        '''Синусы всех углов'''
+        return (table or _default_trig).sin_many(self._data)
+
+    def cos(self, table: 'TrigTable | None' = None) -> array:
+        '''Косинусы всех углов'''
+        return (table or _default_trig).cos_many(self._data)
+
+    def sincos(self, table: 'TrigTable | None' = None) -> tuple[array, array]:
+        '''Синусы и косинусы всех углов'''
+        return (table or _default_trig).sincos_many(self._data)
+
+    # Контейнерные методы
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Angle]:
+        for x in self._data:
+            yield Angle(x)
+
+    def __getitem__(self, index: int | slice) -> 'Angle | AngleArray':
+        if isinstance(index, slice):
+            return self._wrap(self._data[index])
+        return Angle(self._data[index])
+
+    def __setitem__(self, index: int, value: Angle | int | float) -> None:
+        self._data[index] = value._radians if isinstance(value, Angle) else float(value)
+
+    def __str__(self) -> str:
+        '''Преобразование в строку'''
+        return f"AngleArray({len(self._data)} углов)"
+
+    def __repr__(self) -> str:
+        return f"AngleArray({self._data.tolist()})"
+
+    # Второй операнд арифметики: число/Angle (скаляр) или AngleArray той же длины
+    def _operand(self, other: object) -> float | array | None:
+        if isinstance(other, AngleArray):
+            if len(other._data) != len(self._data):
+                raise ValueError(f"Несовпадение длин массивов: {len(self._data)} и {len(other._data)}")
+            return other._data
+        if isinstance(other, Angle):
+            return other._radians
+        if isinstance(other, (int, float)):
+            return float(other)
+        return None
+
+    # Арифметические операции (поэлементно)
+    def __add__(self, other: 'AngleArray | Angle | int | float') -> 'AngleArray':
+        '''Сложение'''
+        value = self._operand(other)
+        if value is None:
+            return NotImplemented
+        if isinstance(value, float):
+            return self._wrap(array('d', [x + value for x in self._data]))
+        return self._wrap(array('d', [x + y for x, y in zip(self._data, value)]))
+
+    def __radd__(self, other: 'Angle | int | float') -> 'AngleArray':
+        '''Правостороннее сложение'''
+        return self.__add__(other)
+
+    def __sub__(self, other: 'AngleArray | Angle | int | float') -> 'AngleArray':
+        '''Вычитание'''
+        value = self._operand(other)
+        if value is None:
+            return NotImplemented
+        if isinstance(value, float):
+            return self._wrap(array('d', [x - value for x in self._data]))
+        return self._wrap(array('d', [x - y for x, y in zip(self._data, value)]))
+
+    def __rsub__(self, other: 'Angle | int | float') -> 'AngleArray':
+        '''Правостороннее вычитание'''
+        value = self._operand(other)
+        if not isinstance(value, float):
+            return NotImplemented
+        return self._wrap(array('d', [value - x for x in self._data]))
+
+    def __mul__(self, other: 'int | float') -> 'AngleArray':
+        '''Умножение на число'''
+        if isinstance(other, (int, float)):
+            return self._wrap(array('d', [x * other for x in self._data]))
+        return NotImplemented
+
+    def __rmul__(self, other: 'int | float') -> 'AngleArray':
+        '''Правостороннее умножение'''
+        return self.__mul__(other)
+
+    def __truediv__(self, other: 'int | float') -> 'AngleArray':
+        '''Деление на число'''
+        if isinstance(other, (int, float)):
+            return self._wrap(array('d', [x / other for x in self._data]))
+        return NotImplemented
+
+    def __rtruediv__(self, other: 'int | float') -> 'AngleArray':
+        '''Правостороннее деление (число делится на каждый угол, как Angle.__rtruediv__)'''
+        if isinstance(other, (int, float)):
+            return self._wrap(array('d', [other / x for x in self._data]))
+        return NotImplemented
+
+    # Поэлементные сравнения (с учетом периодичности)
+    def _compare_operand(self, other: 'AngleArray | Angle') -> float | array:
+        if isinstance(other, AngleArray):
+            if len(other._data) != len(self._data):
+                raise ValueError(f"Несовпадение длин массивов: {len(self._data)} и {len(other._data)}")
+            return other._normalized()
+        if isinstance(other, Angle):
+            return other._normalized()
+        raise TypeError(f"Неподдерживаемый тип: {type(other)}")
+
+    def equal(self, other: 'AngleArray | Angle') -> list[bool]:
+        '''Поэлементная проверка на равенство'''
+        value = self._compare_operand(other)
+        if isinstance(value, float):
+            return [math.isclose(x, value) for x in self._normalized()]
+        return [math.isclose(x, y) for x, y in zip(self._normalized(), value)]
+
+    def less(self, other: 'AngleArray | Angle') -> list[bool]:
+        '''Поэлементно меньше'''
+        value = self._compare_operand(other)
+        if isinstance(value, float):
+            return [x < value for x in self._normalized()]
+        return [x < y for x, y in zip(self._normalized(), value)]
+
+    def less_equal(self, other: 'AngleArray | Angle') -> list[bool]:
+        '''Поэлементно меньше или равно'''
+        value = self._compare_operand(other)
+        if isinstance(value, float):
+            return [x <= value for x in self._normalized()]
+        return [x <= y for x, y in zip(self._normalized(), value)]
+
+    def greater(self, other: 'AngleArray | Angle') -> list[bool]:
+        '''Поэлементно больше'''
+        value = self._compare_operand(other)
+        if isinstance(value, float):
+            return [x > value for x in self._normalized()]
+        return [x > y for x, y in zip(self._normalized(), value)]
+
+    def greater_equal(self, other: 'AngleArray | Angle') -> list[bool]:
+        '''Поэлементно больше или равно'''
+        value = self._compare_operand(other)
+        if isinstance(value, float):
+            return [x >= value for x in self._normalized()]
+        return [x >= y for x, y in zip(self._normalized(), value)]
+
+    def __eq__(self, other: object) -> bool:
+        '''Массивы равны, если попарно равны все углы (с учетом периодичности)'''
+        if not isinstance(other, AngleArray) or len(other._data) != len(self._data):
+            return False
+        return all(self.equal(other))
+
+    def __ne__(self, other: object) -> bool:
+        '''Проверка на неравенство'''
+        return not self.__eq__(other)
+
+
+class BinaryAngle:
+    """Угол в двоичном представлении (BAM): целое число долей полного оборота 2π / 2**bits"""
+    """value - число долей оборота (int), берется по модулю 2**bits, поэтому переполнение и есть периодичность."""
+    """bits - разрядность представления (32 или 64). По умолчанию 32."""
+    __slots__ = ('_value', '_bits')
+
+    def __init__(self, value: int = 0, bits: int = 32) -> None:
+        if bits not in (32, 64):
+            raise ValueError(f"Неподдерживаемая разрядность: {bits}")
+        self._bits = bits
+        self._value = int(value) & ((1 << bits) - 1)
+
+    # Создание из радиан, градусов и Angle
+    @classmethod
+    def from_radians(cls, value: float, bits: int = 32) -> 'BinaryAngle':
+        '''Создание из значения в радианах (с округлением до ближайшей доли)'''
+        return cls(round(float(value) / Angle._TWOPI * (1 << bits)), bits)
+
+    @classmethod
+    def from_degrees(cls, value: float, bits: int = 32) -> 'BinaryAngle':
+        '''Создание из значения в градусах (с округлением до ближайшей доли)'''
+        return cls(round(float(value) / 360 * (1 << bits)), bits)
+
+    @classmethod
+    def from_angle(cls, angle: Angle, bits: int = 32) -> 'BinaryAngle':
+        '''Преобразование из Angle'''
+        return cls.from_radians(angle._radians, bits)
+
+    def to_angle(self) -> Angle:
+        '''Преобразование в Angle (значение в [0, 2π))'''
+        return Angle(self.radians)
+
+    @property
+    def value(self) -> int:
+        '''Число долей оборота'''
+        return self._value
+
+    @property
+    def bits(self) -> int:
+        '''Разрядность'''
+        return self._bits
+
+    @property
+    def radians(self) -> float:
+        '''Значение угла в радианах'''
+        return self._value * Angle._TWOPI / (1 << self._bits)
+
+    @property
+    def degrees(self) -> float:
+        '''Значение угла в градусах'''
+        return self._value * 360 / (1 << self._bits)
+
+    # Методы преобразования типов
+    def __int__(self) -> int:
+        return self._value
+
+    def __float__(self) -> float:
+        return self.radians
+
+    def __str__(self) -> str:
+        return f"BinaryAngle({self._value:#x}/2^{self._bits}, {self.degrees:.2f}°)"
+
+    def __repr__(self) -> str:
+        return f"BinaryAngle({self._value}, bits={self._bits})"
+
+    # Второй операнд в долях оборота этой же разрядности
+    def _raw(self, other: object) -> int | None:
+        if isinstance(other, BinaryAngle):
+            shift = self._bits - other._bits
+            return other._value << shift if shift >= 0 else other._value >> -shift
+        if isinstance(other, Angle):
+            return BinaryAngle.from_radians(other._radians, self._bits)._value
+        if isinstance(other, (int, float)):
+            return BinaryAngle.from_radians(other, self._bits)._value  # числа - в радианах, как у Angle
+        return None
+
+    # Арифметические операции (по модулю 2**bits)
+    def __add__(self, other: 'BinaryAngle | Angle | int | float') -> 'BinaryAngle':
+        '''Сложение'''
+        raw = self._raw(other)
+        if raw is None:
+            return NotImplemented
+        return BinaryAngle(self._value + raw, self._bits)
+
+    def __radd__(self, other: 'Angle | int | float') -> 'BinaryAngle':
+        '''Правостороннее сложение'''
+        return self.__add__(other)
+
+    def __sub__(self, other: 'BinaryAngle | Angle | int | float') -> 'BinaryAngle':
+        '''Вычитание'''
+        raw = self._raw(other)
+        if raw is None:
+            return NotImplemented
+        return BinaryAngle(self._value - raw, self._bits)
+
+    def __rsub__(self, other: 'Angle | int | float') -> 'BinaryAngle':
+        '''Правостороннее вычитание'''
+        raw = self._raw(other)
+        if raw is None:
+            return NotImplemented
+        return BinaryAngle(raw - self._value, self._bits)
+
+    def __neg__(self) -> 'BinaryAngle':
+        return BinaryAngle(-self._value, self._bits)
+
+    def __mul__(self, other: 'int | float') -> 'BinaryAngle':
+        '''Умножение (на int - точно, на float - точно с округлением до ближайшей доли)'''
+        if isinstance(other, int):
+            return BinaryAngle(self._value * other, self._bits)
+        if isinstance(other, float):
+            # значения до 2**64 не помещаются в мантиссу float, поэтому произведение считается в Fraction
+            return BinaryAngle(round(self._value * Fraction(other)), self._bits)
+        return NotImplemented
+
+    def __rmul__(self, other: 'int | float') -> 'BinaryAngle':
+        '''Правостороннее умножение'''
+        return self.__mul__(other)
+
+    def __truediv__(self, other: 'int | float') -> 'BinaryAngle':
+        '''Деление на число (точное, с округлением до ближайшей доли)'''
+        if isinstance(other, (int, float)):
+            return BinaryAngle(round(self._value / Fraction(other)), self._bits)
+        return NotImplemented
+
+    # Методы сравнения: точные, значение уже приведено по модулю
+    def _key64(self) -> int:
+        return self._value << (64 - self._bits)
+
+    def __eq__(self, other: object) -> bool:
+        '''Точная проверка на равенство'''
+        if isinstance(other, BinaryAngle):
+            return self._key64() == other._key64()
+        return False
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __hash__(self) -> int:
+        return hash(self._key64())
+
+    def __lt__(self, other: 'BinaryAngle') -> bool:
+        if isinstance(other, BinaryAngle):
+            return self._key64() < other._key64()
+        return NotImplemented
+
+    def __le__(self, other: 'BinaryAngle') -> bool:
+        if isinstance(other, BinaryAngle):
+            return self._key64() <= other._key64()
+        return NotImplemented
+
+    def __gt__(self, other: 'BinaryAngle') -> bool:
+        if isinstance(other, BinaryAngle):
+            return self._key64() > other._key64()
+        return NotImplemented
+
+    def __ge__(self, other: 'BinaryAngle') -> bool:
+        if isinstance(other, BinaryAngle):
+            return self._key64() >= other._key64()
+        return NotImplemented
+
+
+class TrigTable:
+    """Таблица значений sin/cos для быстрого вычисления тригонометрии по углам"""
+    """resolution - число отсчетов таблицы на полный оборот (int > 0). По умолчанию 4096."""
+    """exact - точный режим: значения через math.sin/math.cos с запоминанием повторяющихся углов (lru_cache)."""
+    """cache_size - размер кэша точного режима. По умолчанию 4096."""
+    def __init__(self, resolution: int = 4096, exact: bool = False, cache_size: int = 4096) -> None:
+        if resolution <= 0:
+            raise ValueError(f"Разрешение таблицы должно быть положительным: {resolution}")
+        self._resolution = resolution
+        self._exact = exact
+        self._scale = resolution / Angle._TWOPI
+        step = Angle._TWOPI / resolution
+        # два лишних отсчета: интерполяция у 2π не выходит за границу таблицы; в точном режиме таблица не нужна
+        count = 0 if exact else resolution + 2
+        self._sin = array('d', [math.sin(i * step) for i in range(count)])
+        self._cos = array('d', [math.cos(i * step) for i in range(count)])
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._exact_sincos)
+
+    @property
+    def resolution(self) -> int:
+        '''Число отсчетов на полный оборот'''
+        return self._resolution
+
+    @property
+    def exact(self) -> bool:
+        '''Точный режим (без таблицы)'''
+        return self._exact
+
+    @staticmethod
+    def _exact_sincos(radians: float) -> tuple[float, float]:
+        return math.sin(radians), math.cos(radians)
+
+    def _lookup(self, table: array, radians: float) -> float:
+        '''Значение из таблицы с линейной интерполяцией между соседними отсчетами'''
+        t = (radians % Angle._TWOPI) * self._scale
+        i = int(t)
+        a = table[i]
+        return a + (table[i + 1] - a) * (t - i)
+
+    def sin(self, radians: float) -> float:
+        '''Синус угла в радианах'''
+        if self._exact:
+            return self._cached(radians)[0]
+        return self._lookup(self._sin, radians)
+
+    def cos(self, radians: float) -> float:
+        '''Косинус угла в радианах'''
+        if self._exact:
+            return self._cached(radians)[1]
+        return self._lookup(self._cos, radians)
+
+    def sincos(self, radians: float) -> tuple[float, float]:
+        '''Синус и косинус угла в радианах за один вызов'''
+        if self._exact:
+            return self._cached(radians)
+        t = (radians % Angle._TWOPI) * self._scale
+        i = int(t)
+        f = t - i
+        s, c = self._sin, self._cos
+        return s[i] + (s[i + 1] - s[i]) * f, c[i] + (c[i + 1] - c[i]) * f
+
+    # Пакетные вычисления для последовательности углов в радианах
+    def sin_many(self, values: Iterable[float]) -> array:
+        '''Синусы последовательности углов'''
+        if self._exact:
+            return array('d', map(math.sin, values))
+        return array('d', [self._lookup(self._sin, x) for x in values])
+
+    def cos_many(self, values: Iterable[float]) -> array:
+        '''Косинусы последовательности углов'''
+        if self._exact:
+            return array('d', map(math.cos, values))
+        return array('d', [self._lookup(self._cos, x) for x in values])
+
+    def sincos_many(self, values: Iterable[float]) -> tuple[array, array]:
+        '''Синусы и косинусы последовательности углов'''
+        values = values if isinstance(values, array) else array('d', values)
+        return self.sin_many(values), self.cos_many(values)
+
+    def cache_info(self) -> 'functools._CacheInfo':
+        '''Статистика кэша точного режима'''
+        return self._cached.cache_info()
+
+    def __repr__(self) -> str:
+        if self._exact:
+            return "TrigTable(exact=True)"
+        return f"TrigTable({self._resolution})"
+
+
+# Таблица по умолчанию для Angle.sin/cos/sincos и AngleArray.sin/cos/sincos (точный режим)
+_default_trig = TrigTable(exact=True)
+
+
+def set_trig_table(table: TrigTable | None) -> TrigTable:
+    '''Задает таблицу по умолчанию для тригонометрии углов (None - точный режим); возвращает прежнюю'''
+    global _default_trig
+    previous = _default_trig
+    _default_trig = table if table is not None else TrigTable(exact=True)
+    return previous
+
+
+# Ядро алгебры диапазонов: работает с числами (нормализованные start, end и флаги),
+# не создавая промежуточных объектов Angle/AngleRange
+_START_INCLUDED = 1
+_END_INCLUDED = 2
+
+
+def _parts_intersect(s1: float, e1: float, f1: int, s2: float, e2: float, f2: int) -> bool:
+    '''Пересечение двух непрерывных частей (аналог AngleRange._ranges_intersect)'''
+    if e1 < s2 or e2 < s1:
+        return False
+    # Проверяем касание
+    if math.isclose(e1, s2):
+        return bool(f1 & _END_INCLUDED and f2 & _START_INCLUDED)
+    if math.isclose(e2, s1):
+        return bool(f2 & _END_INCLUDED and f1 & _START_INCLUDED)
+    return True
+
+
+def _kernel_intersects(ns1: float, ne1: float, f1: int, ns2: float, ne2: float, f2: int) -> bool:
+    '''Пересечение двух диапазонов, заданных нормализованными концами и флагами'''
+    twopi = Angle._TWOPI
+    # Диапазон, пересекающий 0, делится на [start, 2π) и [0, end]
+    if ns1 <= ne1:
+        if ns2 <= ne2:
+            return _parts_intersect(ns1, ne1, f1, ns2, ne2, f2)
+        return (_parts_intersect(ns1, ne1, f1, ns2, twopi, f2 & _START_INCLUDED) or
+                _parts_intersect(ns1, ne1, f1, 0.0, ne2, _START_INCLUDED | (f2 & _END_INCLUDED)))
+    if ns2 <= ne2:
+        return (_parts_intersect(ns1, twopi, f1 & _START_INCLUDED, ns2, ne2, f2) or
+                _parts_intersect(0.0, ne1, _START_INCLUDED | (f1 & _END_INCLUDED), ns2, ne2, f2))
+    head1, head2 = _START_INCLUDED | (f1 & _END_INCLUDED), _START_INCLUDED | (f2 & _END_INCLUDED)
+    return (_parts_intersect(ns1, twopi, f1 & _START_INCLUDED, ns2, twopi, f2 & _START_INCLUDED) or
+            _parts_intersect(ns1, twopi, f1 & _START_INCLUDED, 0.0, ne2, head2) or
+            _parts_intersect(0.0, ne1, head1, ns2, twopi, f2 & _START_INCLUDED) or
+            _parts_intersect(0.0, ne1, head1, 0.0, ne2, head2))
+
+
+def _kernel_union(cs1: float, ce1: float, f1: int, cs2: float, ce2: float, f2: int) -> tuple[float, float, int]:
+    '''Границы объединения пересекающихся диапазонов в непрерывных координатах'''
+    start, start_flag = (cs1, f1) if cs1 <= cs2 else (cs2, f2)
+    end, end_flag = (ce1, f1) if ce1 >= ce2 else (ce2, f2)
+    return start, end, (start_flag & _START_INCLUDED) | (end_flag & _END_INCLUDED)
+
+
+def _kernel_subtract(cs1: float, ce1: float, f1: int, cs2: float, ce2: float, f2: int) -> list[tuple[float, float, int]]:
+    '''Левая и правая части разности пересекающихся диапазонов в непрерывных координатах'''
+    result = []
+    # Левая часть
+    if cs1 < cs2:
+        left_end = min(ce1, cs2)
+        if left_end - cs1 > FloatDivision:
+            result.append((cs1, left_end,
+                           (f1 & _START_INCLUDED) | (0 if f2 & _START_INCLUDED else _END_INCLUDED)))
+    # Правая часть
+    if ce1 > ce2:
+        right_start = max(cs1, ce2)
+        if ce1 - right_start > FloatDivision:
+            result.append((right_start, ce1,
+                           (0 if f2 & _END_INCLUDED else _START_INCLUDED) | (f1 & _END_INCLUDED)))
+    return result
+
+
 class AngleRange:
     """Класс для работы с диапазонами углов"""
     """start - начальный угол диапазона (float, int или Angle)."""
     """end - конечный угол диапазона (float, int или Angle)."""
     """start_included - флаг, указывающий, включен ли начальный угол в диапазон. По умолчанию True."""
     """end_included - флаг, указывающий, включен ли конечный угол в диапазон. По умолчанию False."""
+    __slots__ = ('start', 'end', 'start_included', 'end_included',
+                 '_norm_start', '_norm_end', '_cont_start', '_cont_end', '_crosses_zero')
+
     def __init__(self, start: float|Angle = 0, end: float|Angle = 0, start_included: bool = True, end_included: bool = False) -> None:
-        self.start = self._to_angle(start)
-        self.end = self._to_angle(end)
+        self._setup(self._to_angle(start), self._to_angle(end), start_included, end_included)
+
+    def _setup(self, start: Angle, end: Angle, start_included: bool, end_included: bool) -> None:
+        self.start = start
+        self.end = end
         self.start_included = bool(start_included)
         self.end_included = bool(end_included)
 
@@ -201,6 +781,18 @@ class AngleRange:
             self._cont_start, self._cont_end = self._norm_start, self._norm_end + Angle._TWOPI
             self._crosses_zero = True
 
+    @classmethod
+    def _from_kernel(cls, start: float, end: float, flags: int) -> 'AngleRange':
+        '''Создание диапазона из результата ядра (радианы и флаги) без копирования углов'''
+        obj = cls.__new__(cls)
+        obj._setup(Angle(start), Angle(end), flags & _START_INCLUDED, flags & _END_INCLUDED)
+        return obj
+
+    @property
+    def _flags(self) -> int:
+        '''Флаги включения концов для ядра'''
+        return self.start_included | (self.end_included << 1)
+
     @staticmethod
     def _to_angle(value: float | int | Angle) -> Angle:
         if isinstance(value, Angle):
@@ -269,6 +861,10 @@ class AngleRange:
         return NotImplemented
 
     # Сравнение диапазонов
+    def sort_key(self) -> float:
+        '''Ключ сортировки диапазонов (нормализованное начало), согласован с __lt__'''
+        return self._cont_start
+
     def __lt__(self, other: 'AngleRange') -> bool:
         return isinstance(other, AngleRange) and self._cont_start < other._cont_start
 
@@ -288,20 +884,9 @@ class AngleRange:
 
         # Если диапазоны пересекаются или соприкасаются, объединяем
         if self._intersects(other):
-            # Определяем новые границы
-            starts = [(self._cont_start, self.start_included),
-                      (other._cont_start, other.start_included)]
-            ends = [(self._cont_end, self.end_included),
-                    (other._cont_end, other.end_included)]
-
-            new_start = min(starts, key=lambda x: x[0])
-            new_end = max(ends, key=lambda x: x[0])
-
-            return [AngleRange(
-                Angle(new_start[0] % Angle._TWOPI),
-                Angle(new_end[0] % Angle._TWOPI),
-                new_start[1], new_end[1]
-            )]
+            start, end, flags = _kernel_union(self._cont_start, self._cont_end, self._flags,
+                                              other._cont_start, other._cont_end, other._flags)
+            return [self._from_kernel(start % Angle._TWOPI, end % Angle._TWOPI, flags)]
 
         return [self, other]
 
@@ -313,42 +898,16 @@ class AngleRange:
             return [self]
 
         #возвращаем левую и правую части
-        result = []
-
-        # Левая часть
-        if self._cont_start < other._cont_start:
-            left_end = min(self._cont_end, other._cont_start)
-            if left_end - self._cont_start > FloatDivision:
-                result.append(AngleRange(
-                    Angle(self._cont_start), Angle(left_end),
-                    self.start_included, not other.start_included
-                ))
-        
-        # Правая часть
-        if self._cont_end > other._cont_end:
-            right_start = max(self._cont_start, other._cont_end)
-            if self._cont_end - right_start > FloatDivision:
-                result.append(AngleRange(
-                    Angle(right_start), Angle(self._cont_end),
-                    not other.end_included, self.end_included
-                ))
-
-        return result
+        parts = _kernel_subtract(self._cont_start, self._cont_end, self._flags,
+                                 other._cont_start, other._cont_end, other._flags)
+        return [self._from_kernel(start, end, flags) for start, end, flags in parts]
 
     def _intersects(self, other: 'AngleRange') -> bool:
         '''Проверяет пересечение двух диапазонов'''
         if not isinstance(other, AngleRange):
             return False
-
-        # Разбиваем на непрерывные части
-        self_parts = self._split()
-        other_parts = other._split()
-
-        for sp in self_parts:
-            for op in other_parts:
-                if self._ranges_intersect(sp, op):
-                    return True
-        return False
+        return _kernel_intersects(self._norm_start, self._norm_end, self._flags,
+                                  other._norm_start, other._norm_end, other._flags)
 
     def _split(self) -> list['AngleRange']:
         '''Разбивает диапазон на непрерывные части'''
@@ -374,6 +933,1027 @@ class AngleRange:
 
         return True
 
+
+# Непрерывный промежуток на отрезке [0, 2π]: (start, end, start_included, end_included)
+Interval = tuple[float, float, bool, bool]
+
+
+def _interval_key(interval: Interval) -> tuple[float, bool]:
+    '''Ключ сортировки: по началу, включенное начало раньше исключенного'''
+    return interval[0], not interval[2]
+
+
+def _range_intervals(rng: AngleRange) -> list[Interval]:
+    '''Разбивает диапазон на непрерывные промежутки в [0, 2π] (семантика AngleRange.__contains__)'''
+    return _raw_intervals(rng._norm_start, rng._norm_end, rng.start_included, rng.end_included)
+
+
+def _raw_intervals(norm_start: float, norm_end: float, start_included: bool, end_included: bool) -> list[Interval]:
+    '''То же для диапазона, заданного нормализованными концами и флагами'''
+    if norm_start <= norm_end:
+        if norm_start == norm_end:
+            # точечный диапазон содержит свою точку, если включено начало
+            return [(norm_start, norm_start, True, True)] if start_included else []
+        return [(norm_start, norm_end, start_included, end_included)]
+
+    result = []
+    if norm_end > 0:
+        result.append((0.0, norm_end, True, end_included))
+    elif end_included:
+        result.append((0.0, 0.0, True, True))
+    result.append((norm_start, Angle._TWOPI, start_included, False))
+    return result
+
+
+def _merge_intervals(intervals: Iterable[Interval]) -> Iterator[Interval]:
+    '''Объединяет пересекающиеся и соприкасающиеся промежутки (вход отсортирован по _interval_key)'''
+    current = None
+    for start, end, start_inc, end_inc in intervals:
+        if current is None:
+            current = [start, end, start_inc, end_inc]
+            continue
+        if start < current[1] or (start == current[1] and (current[3] or start_inc)):
+            if start == current[0]:
+                current[2] = current[2] or start_inc
+            if end > current[1]:
+                current[1], current[3] = end, end_inc
+            elif end == current[1]:
+                current[3] = current[3] or end_inc
+        else:
+            yield tuple(current)
+            current = [start, end, start_inc, end_inc]
+    if current is not None:
+        yield tuple(current)
+
+
+def _intersect_intervals(a: list[Interval], b: list[Interval]) -> list[Interval]:
+    '''Пересечение двух канонических списков промежутков (два указателя)'''
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        s1, e1, si1, ei1 = a[i]
+        s2, e2, si2, ei2 = b[j]
+
+        if s1 > s2:
+            start, start_inc = s1, si1
+        elif s2 > s1:
+            start, start_inc = s2, si2
+        else:
+            start, start_inc = s1, si1 and si2
+
+        if e1 < e2:
+            end, end_inc = e1, ei1
+            i += 1
+        elif e2 < e1:
+            end, end_inc = e2, ei2
+            j += 1
+        else:
+            end, end_inc = e1, ei1 and ei2
+            i += 1
+            j += 1
+
+        if start < end or (start == end and start_inc and end_inc):
+            result.append((start, end, start_inc, end_inc))
+    return result
+
+
+def _complement_intervals(intervals: list[Interval]) -> list[Interval]:
+    '''Дополнение канонического списка промежутков до окружности [0, 2π)'''
+    result = []
+    cursor, cursor_inc = 0.0, True
+    for start, end, start_inc, end_inc in intervals:
+        if start > cursor:
+            result.append((cursor, start, cursor_inc, not start_inc))
+        elif start == cursor and cursor_inc and not start_inc:
+            result.append((cursor, cursor, True, True))
+        cursor, cursor_inc = end, not end_inc
+    if cursor < Angle._TWOPI:
+        result.append((cursor, Angle._TWOPI, cursor_inc, False))
+    return result
+
+
+def _interval_contains(interval: Interval, x: float) -> bool:
+    '''Проверяет вхождение нормализованного угла в непрерывный промежуток
+    (порядок проверок как в AngleRange.__contains__: сначала внутренность, затем концы)'''
+    if interval[0] < x < interval[1]:
+        return True
+    if math.isclose(x, interval[0]):
+        return interval[2]
+    if math.isclose(x, interval[1]):
+        return interval[3]
+    return False
+
+
+def _intervals_overlap(a: Interval, b: Interval) -> bool:
+    '''Проверяет пересечение (или касание включенными концами) двух непрерывных промежутков'''
+    if a[0] > b[0]:
+        start, start_inc = a[0], a[2]
+    elif b[0] > a[0]:
+        start, start_inc = b[0], b[2]
+    else:
+        start, start_inc = a[0], a[2] and b[2]
+
+    if a[1] < b[1]:
+        end, end_inc = a[1], a[3]
+    elif b[1] < a[1]:
+        end, end_inc = b[1], b[3]
+    else:
+        end, end_inc = a[1], a[3] and b[3]
+
+    return start < end or (start == end and start_inc and end_inc)
+
+
+class AngleRangeSet:
+    """Множество углов в виде отсортированного списка непересекающихся промежутков"""
+    """ranges - набор диапазонов (AngleRange), которые объединяются при создании."""
+    """Промежутки, пересекающие 0, хранятся разбитыми на две части: [0, end] и [start, 2π)."""
+    def __init__(self, ranges: Iterable[AngleRange] = ()) -> None:
+        intervals = [iv for rng in ranges for iv in _range_intervals(rng)]
+        intervals.sort(key=_interval_key)
+        self._set_intervals(list(_merge_intervals(intervals)))
+
+    def _set_intervals(self, intervals: list[Interval]) -> None:
+        self._intervals = intervals
+        self._starts = [iv[0] for iv in intervals]  # для поиска bisect
+
+    @classmethod
+    def from_catalog(cls, catalog: 'RangeCatalog') -> 'AngleRangeSet':
+        '''Множество из каталога без создания объектов AngleRange'''
+        intervals = []
+        for ns, ne, flags in catalog.iter_raw():
+            intervals.extend(_raw_intervals(ns, ne, bool(flags & _START_INCLUDED), bool(flags & _END_INCLUDED)))
+        intervals.sort(key=_interval_key)
+        return cls._from_intervals(list(_merge_intervals(intervals)))
+
+    @classmethod
+    def _from_intervals(cls, intervals: list[Interval]) -> 'AngleRangeSet':
+        '''Создание множества из уже канонического списка промежутков'''
+        obj = cls.__new__(cls)
+        obj._set_intervals(intervals)
+        return obj
+
+    @staticmethod
+    def _coerce(other: object) -> 'AngleRangeSet | None':
+        if isinstance(other, AngleRangeSet):
+            return other
+        if isinstance(other, AngleRange):
+            return AngleRangeSet([other])
+        return None
+
+    @staticmethod
+    def _to_range(interval: Interval) -> AngleRange:
+        start, end, start_inc, end_inc = interval
+        return AngleRange(Angle(start), Angle(end), start_inc, end_inc)
+
+    # Представление в виде AngleRange
+    def ranges(self) -> list[AngleRange]:
+        '''Список диапазонов (части, разрезанные в нуле, склеиваются обратно)'''
+        intervals = self._intervals
+        if not intervals:
+            return []
+
+        head = None
+        tail = None
+        if intervals[-1][1] == Angle._TWOPI:
+            if intervals[-1][0] == 0:
+                # Вся окружность не выражается одним AngleRange
+                return [AngleRange(0, math.pi), AngleRange(math.pi, Angle._TWOPI)]
+            tail = intervals[-1]
+            if len(intervals) > 1 and intervals[0][0] == 0 and intervals[0][2]:
+                head = intervals[0]
+                if head[1] == tail[0]:
+                    # Окружность без одной точки: склейка дала бы пустой AngleRange(x, x)
+                    return [self._to_range(head), self._to_range(tail)]
+
+        body = intervals[1 if head else 0:-1 if tail else None]
+        result = [self._to_range(iv) for iv in body]
+        if tail is not None:
+            end, end_inc = (head[1], head[3]) if head else (Angle._TWOPI, False)
+            result.append(AngleRange(Angle(tail[0]), Angle(end), tail[2], end_inc))
+        return result
+
+    def __iter__(self) -> Iterator[AngleRange]:
+        return iter(self.ranges())
+
+    def __len__(self) -> int:
+        return len(self.ranges())
+
+    def __bool__(self) -> bool:
+        return bool(self._intervals)
+
+    def __str__(self) -> str:
+        return f"AngleRangeSet({', '.join(str(r) for r in self.ranges())})"
+
+    def __repr__(self) -> str:
+        return f"AngleRangeSet({self.ranges()!r})"
+
+    def __abs__(self) -> float:
+        '''Суммарная длина промежутков'''
+        return sum(end - start for start, end, _, _ in self._intervals)
+
+    length = property(__abs__)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AngleRangeSet) or len(self._intervals) != len(other._intervals):
+            return False
+        return all(math.isclose(a[0], b[0]) and math.isclose(a[1], b[1]) and a[2:] == b[2:]
+                   for a, b in zip(self._intervals, other._intervals))
+
+    def __contains__(self, item: Angle | int | float | AngleRange) -> bool:
+        # Проверка вхождения угла: бинарный поиск промежутка
+        if isinstance(item, (Angle, int, float)):
+            x = item._normalized() if isinstance(item, Angle) else float(item) % Angle._TWOPI
+            i = bisect.bisect_right(self._starts, x) - 1
+            for k in (i, i + 1):
+                if 0 <= k < len(self._intervals) and _interval_contains(self._intervals[k], x):
+                    return True
+            return False
+
+        # Проверка вхождения диапазона: каждая его часть лежит в одном промежутке
+        if isinstance(item, AngleRange):
+            return not _intersect_intervals(_range_intervals(item),
+                                            _complement_intervals(self._intervals))
+
+        return NotImplemented
+
+    # Операции над множествами
+    def union(self, *others: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        '''Объединение с произвольным числом множеств/диапазонов'''
+        sets = [self] + [self._coerce(o) for o in others]
+        if any(s is None for s in sets):
+            raise TypeError("Ожидались AngleRangeSet или AngleRange")
+        merged = heapq.merge(*(s._intervals for s in sets), key=_interval_key)
+        return self._from_intervals(list(_merge_intervals(merged)))
+
+    def intersection(self, *others: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        '''Пересечение с произвольным числом множеств/диапазонов'''
+        intervals = self._intervals
+        for other in others:
+            other_set = self._coerce(other)
+            if other_set is None:
+                raise TypeError("Ожидались AngleRangeSet или AngleRange")
+            intervals = _intersect_intervals(intervals, other_set._intervals)
+        return self._from_intervals(intervals)
+
+    def difference(self, *others: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        '''Разность: промежутки self, не покрытые ни одним из others'''
+        if not others:
+            return self._from_intervals(list(self._intervals))
+        removed = AngleRangeSet().union(*others)
+        return self._from_intervals(_intersect_intervals(self._intervals,
+                                                         _complement_intervals(removed._intervals)))
+
+    def complement(self) -> 'AngleRangeSet':
+        '''Дополнение до полной окружности'''
+        return self._from_intervals(_complement_intervals(self._intervals))
+
+    def __or__(self, other: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        if self._coerce(other) is None:
+            return NotImplemented
+        return self.union(other)
+
+    def __and__(self, other: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        if self._coerce(other) is None:
+            return NotImplemented
+        return self.intersection(other)
+
+    def __sub__(self, other: 'AngleRangeSet | AngleRange') -> 'AngleRangeSet':
+        if self._coerce(other) is None:
+            return NotImplemented
+        return self.difference(other)
+
+    def __invert__(self) -> 'AngleRangeSet':
+        return self.complement()
+
+
+# Запас отсечения в дереве интервалов: больше допуска math.isclose (rel_tol=1e-9) для углов из [0, 2π]
+_PRUNE_TOL = 1e-8
+
+
+class _IntervalNode:
+    '''Узел центрированного дерева интервалов'''
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, entries: list[tuple]) -> None:
+        # центр - медиана начал: в каждое поддерево уходит не больше половины промежутков
+        starts = sorted(e[0] for e in entries)
+        self.center = center = starts[len(starts) // 2]
+
+        left, right, here = [], [], []
+        for entry in entries:
+            if entry[1] < center:
+                left.append(entry)
+            elif entry[0] > center:
+                right.append(entry)
+            else:
+                here.append(entry)
+
+        self.by_start = sorted(here, key=lambda e: e[0])
+        self.by_end = sorted(here, key=lambda e: e[1], reverse=True)
+        self.left = _IntervalNode(left) if left else None
+        self.right = _IntervalNode(right) if right else None
+
+    def stab(self, x: float, found: dict) -> None:
+        '''Собирает ключи промежутков, содержащих точку x'''
+        # отсечение с запасом _PRUNE_TOL: концы, близкие к x по math.isclose, проверяет _interval_contains
+        lo, hi = x - _PRUNE_TOL, x + _PRUNE_TOL
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if hi < node.center:
+                for entry in node.by_start:
+                    if entry[0] > hi:
+                        break
+                    if _interval_contains(entry, x):
+                        found[entry[4]] = None
+                if node.left is not None:
+                    stack.append(node.left)
+            elif lo > node.center:
+                for entry in node.by_end:
+                    if entry[1] < lo:
+                        break
+                    if _interval_contains(entry, x):
+                        found[entry[4]] = None
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                for entry in node.by_start:
+                    if _interval_contains(entry, x):
+                        found[entry[4]] = None
+                if node.right is not None:
+                    stack.append(node.right)
+                if node.left is not None:
+                    stack.append(node.left)
+
+    def overlap(self, query: Interval, found: dict) -> None:
+        '''Собирает ключи промежутков, пересекающихся с query'''
+        lo, hi = query[0] - _PRUNE_TOL, query[1] + _PRUNE_TOL
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if hi < node.center:
+                for entry in node.by_start:
+                    if entry[0] > hi:
+                        break
+                    if _intervals_overlap(entry, query):
+                        found[entry[4]] = None
+                if node.left is not None:
+                    stack.append(node.left)
+            elif lo > node.center:
+                for entry in node.by_end:
+                    if entry[1] < lo:
+                        break
+                    if _intervals_overlap(entry, query):
+                        found[entry[4]] = None
+                if node.right is not None:
+                    stack.append(node.right)
+            else:
+                for entry in node.by_start:
+                    if _intervals_overlap(entry, query):
+                        found[entry[4]] = None
+                if node.left is not None:
+                    stack.append(node.left)
+                if node.right is not None:
+                    stack.append(node.right)
+
+
+class AngleRangeIndex:
+    """Индекс для поиска диапазонов, содержащих угол (stabbing) или пересекающих диапазон"""
+    """ranges - начальный набор диапазонов (AngleRange)."""
+    """Диапазоны, пересекающие 0, разбиваются на две части. Хранится O(log n) статических деревьев
+    интервалов убывающего размера: вставка перестраивает только младшие деревья,
+    удаленные ключи помечаются и вычищаются полной перестройкой."""
+    def __init__(self, ranges: Iterable[AngleRange] = ()) -> None:
+        self._ranges: dict[int, AngleRange] = {}
+        self._next_key = 0
+        self._levels: list[tuple[_IntervalNode, list[tuple]]] = []
+        self._removed: set[int] = set()
+        self._catalog: RangeCatalog | None = None  # ключи 0..len-1 - номера диапазонов каталога
+        self._catalog_removed: set[int] = set()
+
+        entries = []
+        for rng in ranges:
+            entries.extend(self._register(rng))
+        if entries:
+            self._add_level_entries(entries)
+
+    @classmethod
+    def from_catalog(cls, catalog: 'RangeCatalog') -> 'AngleRangeIndex':
+        '''Индекс по каталогу: ключ - номер диапазона, объекты AngleRange создаются только для результатов'''
+        index = cls()
+        index._catalog = catalog
+        index._next_key = len(catalog)
+        entries = []
+        for key, (ns, ne, flags) in enumerate(catalog.iter_raw()):
+            for interval in _raw_intervals(ns, ne, bool(flags & _START_INCLUDED), bool(flags & _END_INCLUDED)):
+                entries.append(interval + (key,))
+        if entries:
+            index._add_level_entries(entries)
+        return index
+
+    def _in_catalog(self, key: int) -> bool:
+        return (self._catalog is not None and 0 <= key < len(self._catalog)
+                and key not in self._catalog_removed)
+
+    def _register(self, rng: AngleRange) -> list[tuple]:
+        '''Выдает ключ диапазону и возвращает записи его непрерывных частей'''
+        if not isinstance(rng, AngleRange):
+            raise TypeError(f"Неподдерживаемый тип: {type(rng)}")
+        key = self._next_key
+        self._next_key += 1
+        self._ranges[key] = rng
+        return [iv + (key,) for iv in _range_intervals(rng)]
+
+    def _add_level_entries(self, entries: list[tuple]) -> None:
+        '''Добавляет дерево из записей, сливая с ним младшие деревья сопоставимого размера'''
+        # каждое дерево больше следующего более чем вдвое, поэтому деревьев O(log n)
+        while self._levels and len(self._levels[-1][1]) <= 2 * len(entries):
+            entries.extend(self._levels.pop()[1])
+        self._levels.append((_IntervalNode(entries), entries))
+
+    def rebuild(self) -> None:
+        '''Полная перестройка индекса без удаленных диапазонов'''
+        entries = [e for lv in self._levels for e in lv[1] if e[4] not in self._removed]
+        self._levels = []
+        self._removed.clear()
+        if entries:
+            self._add_level_entries(entries)
+
+    def insert(self, rng: AngleRange) -> int:
+        '''Добавляет диапазон, возвращает его ключ (амортизированно O(log^2 n))'''
+        entries = self._register(rng)
+        if entries:
+            self._add_level_entries(entries)
+        return self._next_key - 1
+
+    def remove(self, key: int) -> AngleRange:
+        '''Удаляет диапазон по ключу, возвращает его'''
+        if key in self._ranges:
+            rng = self._ranges.pop(key)
+        elif self._in_catalog(key):
+            rng = self._catalog[key]
+            self._catalog_removed.add(key)
+        else:
+            raise KeyError(key)
+        self._removed.add(key)
+        if len(self._removed) * 2 > len(self) + len(self._removed):
+            self.rebuild()
+        return rng
+
+    def __len__(self) -> int:
+        if self._catalog is None:
+            return len(self._ranges)
+        return len(self._ranges) + len(self._catalog) - len(self._catalog_removed)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._ranges or self._in_catalog(key)
+
+    def __getitem__(self, key: int) -> AngleRange:
+        if key in self._ranges:
+            return self._ranges[key]
+        if self._in_catalog(key):
+            return self._catalog[key]
+        raise KeyError(key)
+
+    def _collect(self, found: dict) -> list[AngleRange]:
+        return [self[key] for key in found if key not in self._removed]
+
+    def stab(self, angle: Angle | int | float) -> list[AngleRange]:
+        '''Диапазоны, содержащие угол: O(log^2 n + k)'''
+        x = angle._normalized() if isinstance(angle, Angle) else float(angle) % Angle._TWOPI
+        found: dict[int, None] = {}
+        for node, _ in self._levels:
+            node.stab(x, found)
+        return self._collect(found)
+
+    def overlap(self, rng: AngleRange) -> list[AngleRange]:
+        '''Диапазоны, пересекающиеся с rng (касание включенными концами считается пересечением)'''
+        found: dict[int, None] = {}
+        for query in _range_intervals(rng):
+            for node, _ in self._levels:
+                node.overlap(query, found)
+        return self._collect(found)
+
+
+# Потоковое объединение диапазонов
+_SPILL_RECORD = struct.Struct('<ddB')  # start, end, флаги (_START_INCLUDED | _END_INCLUDED)
+
+
+def stream_sort_key(rng: AngleRange) -> float:
+    '''Ключ сортировки входного потока для merge_range_stream(presorted=True):
+    диапазоны, пересекающие 0, начинаются с части [0, end] и идут первыми'''
+    return 0.0 if rng._crosses_zero else rng._norm_start
+
+
+def _presorted_intervals(ranges: Iterable[AngleRange]) -> Iterator[Interval]:
+    '''Промежутки отсортированного по stream_sort_key потока в порядке начала'''
+    tail = None  # объединение частей [start, 2π) всех диапазонов, пересекающих 0
+    last_key = 0.0
+    for rng in ranges:
+        key = stream_sort_key(rng)
+        if key < last_key:
+            raise ValueError(f"Поток не отсортирован по stream_sort_key: {rng!r}")
+        last_key = key
+
+        intervals = _range_intervals(rng)
+        if rng._crosses_zero:
+            *head, rng_tail = intervals
+            if tail is None or _interval_key(rng_tail) < _interval_key(tail):
+                tail = rng_tail
+            yield from head
+            continue
+
+        for interval in intervals:
+            if tail is not None and _interval_key(tail) <= _interval_key(interval):
+                yield tail
+                tail = None
+            yield interval
+    if tail is not None:
+        yield tail
+
+
+def _spill_reader(spill: 'tempfile._TemporaryFileWrapper', block: int = 4096) -> Iterator[Interval]:
+    '''Чтение отсортированного блока промежутков из временного файла'''
+    spill.seek(0)
+    while True:
+        data = spill.read(_SPILL_RECORD.size * block)
+        if not data:
+            return
+        for start, end, flags in _SPILL_RECORD.iter_unpack(data):
+            yield start, end, bool(flags & _START_INCLUDED), bool(flags & _END_INCLUDED)
+
+
+def _external_sorted_intervals(ranges: Iterable[AngleRange], chunk_size: int) -> Iterator[Interval]:
+    '''Внешняя сортировка: блоки по chunk_size диапазонов сортируются и сбрасываются во временные файлы,
+    затем сливаются heapq.merge'''
+    spills = []
+    chunk: list[Interval] = []
+    count = 0
+    try:
+        for rng in ranges:
+            chunk.extend(_range_intervals(rng))
+            count += 1
+            if count == chunk_size:
+                chunk.sort(key=_interval_key)
+                spill = tempfile.TemporaryFile()
+                spill.write(b''.join(_SPILL_RECORD.pack(s, e, si | (ei << 1)) for s, e, si, ei in chunk))
+                spills.append(spill)
+                chunk, count = [], 0
+
+        chunk.sort(key=_interval_key)
+        if not spills:
+            yield from chunk
+            return
+        yield from heapq.merge(chunk, *(_spill_reader(spill) for spill in spills), key=_interval_key)
+    finally:
+        for spill in spills:
+            spill.close()
+
+
+def merge_range_stream(ranges: Iterable[AngleRange], presorted: bool = False,
+                       chunk_size: int = 100_000) -> Iterator[AngleRange]:
+    '''Объединение потока диапазонов методом заметающей прямой с выдачей результата по мере готовности.
+    presorted - поток уже отсортирован по stream_sort_key (память O(1));
+    иначе выполняется внешняя сортировка блоками по chunk_size диапазонов.
+    Часть, начинающаяся в 0, придерживается до конца потока для склейки через 0.'''
+    if chunk_size < 1:
+        raise ValueError("chunk_size должен быть положительным")
+    intervals = _presorted_intervals(ranges) if presorted else _external_sorted_intervals(ranges, chunk_size)
+
+    head = None  # первый промежуток [0, ...], может склеиться с последним [..., 2π)
+    pending = None  # последний выданный слиянием промежуток (еще неизвестно, последний ли он)
+    for interval in _merge_intervals(intervals):
+        if head is None and pending is None and interval[0] == 0 and interval[2]:
+            head = interval
+            continue
+        if pending is not None:
+            yield AngleRangeSet._to_range(pending)
+        pending = interval
+
+    tail = [iv for iv in (head, pending) if iv is not None]
+    yield from AngleRangeSet._from_intervals(tail).ranges()
+
+
+# Статистика покрытия окружности
+@dataclass
+class CoverageStats:
+    '''Результат анализа покрытия окружности набором диапазонов'''
+    # длина объединения - точная мера, равна abs(AngleRangeSet). В отличие от AngleRange.__abs__, исключенные концы
+    # не уменьшают длину на FloatDivision (разница не больше 2 * FloatDivision на каждый объединенный диапазон)
+    covered: float
+    max_depth: int  # максимальная глубина перекрытия
+    bin_covered: list[float] = field(default_factory=list)  # покрытая длина в каждом секторе
+    bin_max_depth: list[int] = field(default_factory=list)  # максимальная глубина в каждом секторе
+    bin_mean_depth: list[float] = field(default_factory=list)  # средняя глубина (сумма длин / ширина сектора)
+
+
+def _bin_span(start: float, end: float, width: float, bins: int) -> tuple[int, int]:
+    '''Номера первого и последнего сектора, которые задевает промежуток ненулевой длины'''
+    first = min(int(start / width), bins - 1)
+    last = min(int(end / width), bins - 1)
+    if last > first and last * width >= end:
+        last -= 1  # конец ровно на границе сектора
+    return first, last
+
+
+def _bin_lengths(intervals: Iterable[Interval], bins: int) -> list[float]:
+    '''Покрытая промежутками длина в каждом секторе (полные сектора - через разностный массив)'''
+    width = Angle._TWOPI / bins
+    partial = [0.0] * bins
+    full = [0] * (bins + 1)
+    for start, end, _, _ in intervals:
+        if end <= start:
+            continue
+        first, last = _bin_span(start, end, width, bins)
+        if first == last:
+            partial[first] += end - start
+            continue
+        partial[first] += (first + 1) * width - start
+        partial[last] += end - last * width
+        full[first + 1] += 1
+        full[last] -= 1
+
+    count = 0
+    for b in range(bins):
+        count += full[b]
+        partial[b] += count * width
+    return partial
+
+
+def _coverage_partial(starts: array, ends: array, flags: bytes, bins: int) -> tuple[list[Interval], list[tuple[float, int]], list[float]]:
+    '''Обработка одного блока диапазонов (выполняется в процессе пула):
+    возвращает объединение блока, события глубины (позиция, изменение) и суммы длин по секторам'''
+    intervals = []
+    for ns, ne, f in zip(starts, ends, flags):
+        intervals.extend(_raw_intervals(ns, ne, bool(f & _START_INCLUDED), bool(f & _END_INCLUDED)))
+    intervals.sort(key=_interval_key)
+
+    events: dict[float, int] = {}
+    for start, end, _, _ in intervals:
+        if end > start:
+            events[start] = events.get(start, 0) + 1
+            events[end] = events.get(end, 0) - 1
+
+    union = list(_merge_intervals(intervals))
+    return union, sorted((pos, d) for pos, d in events.items() if d), _bin_lengths(intervals, bins)
+
+
+def _range_chunks(ranges: Iterable[AngleRange], chunk_size: int) -> Iterator[tuple[array, array, bytes]]:
+    '''Блоки столбцов (начала, концы, флаги) по chunk_size диапазонов, по мере чтения входа'''
+    starts, ends, flags = array('d'), array('d'), bytearray()
+    for rng in ranges:
+        starts.append(rng._norm_start)
+        ends.append(rng._norm_end)
+        flags.append(rng._flags)
+        if len(starts) == chunk_size:
+            yield starts, ends, bytes(flags)
+            starts, ends, flags = array('d'), array('d'), bytearray()
+    if starts:
+        yield starts, ends, bytes(flags)
+
+
+def _pool_partials(chunks: Iterator[tuple[array, array, bytes]], bins: int, workers: int) -> list:
+    '''Обработка блоков в пуле процессов: в работе не больше 2 * workers блоков,
+    следующий блок читается только после завершения самого старого (порядок результатов сохраняется)'''
+    partials = []
+    in_flight = collections.deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            if len(in_flight) >= 2 * workers:
+                partials.append(in_flight.popleft().result())
+            in_flight.append(pool.submit(_coverage_partial, *chunk, bins))
+        while in_flight:
+            partials.append(in_flight.popleft().result())
+    return partials
+
+
+def coverage_stats(ranges: 'Iterable[AngleRange] | RangeCatalog', bins: int = 360, workers: int | None = None,
+                   chunk_size: int = 100_000) -> CoverageStats:
+    '''Покрытая длина, глубина перекрытия и гистограммы по bins секторам.
+    Блоки по chunk_size диапазонов обрабатываются в пуле процессов (workers, по умолчанию - число ядер),
+    частичные результаты сливаются. Глубина считается по участкам ненулевой длины.'''
+    if bins < 1 or chunk_size < 1:
+        raise ValueError("bins и chunk_size должны быть положительными")
+
+    # блоки читаются лениво (из каталога - прямо из отображенного файла), целиком вход в памяти не копируется
+    chunks = ranges.chunks(chunk_size) if isinstance(ranges, RangeCatalog) else _range_chunks(ranges, chunk_size)
+    head = list(itertools.islice(chunks, 2))  # пул нужен, только если блоков больше одного
+    chunks = itertools.chain(head, chunks)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(head) <= 1:
+        partials = [_coverage_partial(*chunk, bins) for chunk in chunks]
+    else:
+        partials = _pool_partials(chunks, bins, workers)
+
+    return _reduce_coverage(partials, bins)
+
+
+def _reduce_coverage(partials: list[tuple[list[Interval], list[tuple[float, int]], list[float]]],
+                     bins: int) -> CoverageStats:
+    '''Слияние частичных результатов блоков'''
+    width = Angle._TWOPI / bins
+
+    # Объединение: слияние отсортированных объединений блоков
+    union = list(_merge_intervals(heapq.merge(*(p[0] for p in partials), key=_interval_key)))
+    covered = sum(end - start for start, end, _, _ in union)  # мера объединения, см. CoverageStats.covered
+    bin_covered = _bin_lengths(union, bins)
+
+    # Средняя глубина аддитивна по блокам
+    bin_mean_depth = [0.0] * bins
+    for _, _, lengths in partials:
+        for b, length in enumerate(lengths):
+            bin_mean_depth[b] += length
+    bin_mean_depth = [total / width for total in bin_mean_depth]
+
+    # Максимальная глубина: заметание слитых событий (в одной точке концы раньше начал)
+    bin_max_depth = [0] * bins
+    max_depth = depth = 0
+    prev = 0.0
+    for pos, delta in heapq.merge(*(p[1] for p in partials)):
+        if pos > prev and depth > 0:
+            max_depth = max(max_depth, depth)
+            first, last = _bin_span(prev, pos, width, bins)
+            for b in range(first, last + 1):
+                if bin_max_depth[b] < depth:
+                    bin_max_depth[b] = depth
+        depth += delta
+        prev = pos
+
+    return CoverageStats(covered, max_depth, bin_covered, bin_max_depth, bin_mean_depth)
+
+
+# Двоичный каталог диапазонов: заголовок, затем столбцы start[n] (float64), end[n] (float64),
+# flags[n] (uint8, _START_INCLUDED | _END_INCLUDED). Концы хранятся нормализованными, little-endian.
+_CATALOG_MAGIC = b'ANGR'
+_CATALOG_VERSION = 1
+_CATALOG_HEADER = struct.Struct('<4sHHQ')  # сигнатура, версия, резерв, число диапазонов
+
+
+def _write_column(f, column: array) -> None:
+    if sys.byteorder != 'little':
+        column = array(column.typecode, column)
+        column.byteswap()
+    column.tofile(f)
+
+
+def write_range_catalog(path: str, ranges: Iterable[AngleRange], block: int = 65536) -> int:
+    '''Записывает диапазоны в двоичный каталог потоково, возвращает их число'''
+    count = 0
+    with open(path, 'wb') as f, tempfile.TemporaryFile() as ends_tmp, tempfile.TemporaryFile() as flags_tmp:
+        f.write(_CATALOG_HEADER.pack(_CATALOG_MAGIC, _CATALOG_VERSION, 0, 0))
+        starts, ends, flags = array('d'), array('d'), bytearray()
+        for rng in ranges:
+            starts.append(rng._norm_start)
+            ends.append(rng._norm_end)
+            flags.append(rng._flags)
+            if len(starts) == block:
+                _write_column(f, starts)
+                _write_column(ends_tmp, ends)
+                flags_tmp.write(flags)
+                count += block
+                starts, ends, flags = array('d'), array('d'), bytearray()
+        _write_column(f, starts)
+        _write_column(ends_tmp, ends)
+        flags_tmp.write(flags)
+        count += len(starts)
+
+        # столбцы end и flags дописываются после start
+        for tmp in (ends_tmp, flags_tmp):
+            tmp.seek(0)
+            shutil.copyfileobj(tmp, f)
+        f.seek(0)
+        f.write(_CATALOG_HEADER.pack(_CATALOG_MAGIC, _CATALOG_VERSION, 0, count))
+    return count
+
+
+class RangeCatalog:
+    """Каталог диапазонов, отображенный в память (mmap): открытие не читает данные"""
+    """path - путь к файлу, записанному write_range_catalog."""
+    """starts, ends, flags - представления столбцов (memoryview) без копирования; AngleRange создаются по запросу."""
+    def __init__(self, path: str) -> None:
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Пустой файл каталога: {path}")
+
+        magic, version, _, count = _CATALOG_HEADER.unpack_from(self._mmap, 0)
+        if magic != _CATALOG_MAGIC or version != _CATALOG_VERSION:
+            self.close()
+            raise ValueError(f"Неверный формат каталога: {path}")
+        offset = _CATALOG_HEADER.size
+        if len(self._mmap) < offset + 17 * count:
+            self.close()
+            raise ValueError(f"Каталог обрезан: {path}")
+
+        self._count = count
+        view = memoryview(self._mmap)
+        if sys.byteorder == 'little':
+            self.starts = view[offset:offset + 8 * count].cast('d')
+            self.ends = view[offset + 8 * count:offset + 16 * count].cast('d')
+        else:
+            # на big-endian столбцы приходится копировать с перестановкой байтов
+            self.starts, self.ends = array('d'), array('d')
+            self.starts.frombytes(view[offset:offset + 8 * count])
+            self.ends.frombytes(view[offset + 8 * count:offset + 16 * count])
+            self.starts.byteswap()
+            self.ends.byteswap()
+        self.flags = view[offset + 16 * count:offset + 17 * count]
+        self._views = [view, self.starts, self.ends, self.flags]
+
+    def close(self) -> None:
+        '''Освобождает представления и закрывает файл'''
+        for view in getattr(self, '_views', ()):
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'RangeCatalog':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> AngleRange:
+        flags = self.flags[index]
+        return AngleRange._from_kernel(self.starts[index], self.ends[index], flags)
+
+    def __iter__(self) -> Iterator[AngleRange]:
+        for ns, ne, flags in self.iter_raw():
+            yield AngleRange._from_kernel(ns, ne, flags)
+
+    def iter_raw(self) -> Iterator[tuple[float, float, int]]:
+        '''Диапазоны в виде (start, end, flags) без создания объектов'''
+        return zip(self.starts, self.ends, self.flags)
+
+    def chunks(self, size: int) -> Iterator[tuple[array, array, bytes]]:
+        '''Блоки столбцов (копии) по size диапазонов, например для coverage_stats'''
+        for first in range(0, self._count, size):
+            last = min(first + size, self._count)
+            starts, ends = array('d'), array('d')
+            starts.frombytes(self.starts[first:last].cast('B') if isinstance(self.starts, memoryview)
+                             else self.starts[first:last].tobytes())
+            ends.frombytes(self.ends[first:last].cast('B') if isinstance(self.ends, memoryview)
+                           else self.ends[first:last].tobytes())
+            yield starts, ends, bytes(self.flags[first:last])
+
+    def to_set(self) -> AngleRangeSet:
+        '''Объединение всех диапазонов каталога'''
+        return AngleRangeSet.from_catalog(self)
+
+    def index(self) -> AngleRangeIndex:
+        '''Индекс для stabbing/overlap-запросов по каталогу'''
+        return AngleRangeIndex.from_catalog(self)
+
+
+class AngleHashIndex:
+    """Хэш-индекс углов с допуском: нормализованный угол квантуется в корзины ширины не больше eps"""
+    """angles - начальный набор углов (Angle, BinaryAngle или число в радианах); близкие дубликаты отбрасываются."""
+    """eps - допуск (радианы): углы на периодическом расстоянии <= eps считаются совпадающими."""
+    """Angle не имеет __hash__ (равенство через isclose нетранзитивно), поэтому дубликаты ищутся
+    в своей и соседних корзинах, включая соседство через 0/2π."""
+    def __init__(self, angles: Iterable[Angle | BinaryAngle | float] = (), eps: float = 1e-9) -> None:
+        if eps <= 0:
+            raise ValueError("eps должен быть положительным")
+        self._eps = eps
+        self._nbuckets = max(1, math.ceil(Angle._TWOPI / eps))
+        self._width = Angle._TWOPI / self._nbuckets  # одинаковая ширина, в т.ч. у последней корзины
+        self._buckets: dict[int, list[tuple[float, Angle | BinaryAngle | float]]] = {}
+        self._keys: list[int] = []  # отсортированные номера непустых корзин (для поиска ближайших)
+        self._size = 0
+        for angle in angles:
+            self.add(angle)
+
+    @staticmethod
+    def _norm(angle: Angle | BinaryAngle | float) -> float:
+        if isinstance(angle, Angle):
+            return angle._normalized()
+        if isinstance(angle, BinaryAngle):
+            return angle.radians
+        if isinstance(angle, (int, float)):
+            return float(angle) % Angle._TWOPI
+        raise TypeError(f"Неподдерживаемый тип: {type(angle)}")
+
+    @staticmethod
+    def _distance(a: float, b: float) -> float:
+        '''Расстояние между нормализованными углами по окружности'''
+        d = abs(a - b)
+        return min(d, Angle._TWOPI - d)
+
+    def _bucket(self, x: float) -> int:
+        return min(int(x / self._width), self._nbuckets - 1)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Angle | BinaryAngle | float]:
+        for key in self._keys:
+            for _, angle in self._buckets[key]:
+                yield angle
+
+    def _within(self, x: float, radius: float) -> Iterator[tuple[float, Angle | BinaryAngle | float]]:
+        reach = math.ceil(radius / self._width)
+        n = self._nbuckets
+        center = self._bucket(x)
+        if 2 * reach + 1 >= n:
+            keys = self._keys
+        elif 2 * reach + 1 <= 8:
+            keys = [(center + k) % n for k in range(-reach, reach + 1)]
+        else:
+            # широкий радиус: только непустые корзины из отрезка номеров (с переходом через 0)
+            lo, hi = center - reach, center + reach
+            segments = [(lo, hi)]
+            if lo < 0:
+                segments = [(lo + n, n - 1), (0, hi)]
+            elif hi >= n:
+                segments = [(lo, n - 1), (0, hi - n)]
+            keys = [key for a, b in segments
+                    for key in self._keys[bisect.bisect_left(self._keys, a):bisect.bisect_right(self._keys, b)]]
+        for key in keys:
+            for item in self._buckets.get(key, ()):
+                if self._distance(item[0], x) <= radius:
+                    yield item
+
+    def find_within(self, angle: Angle | BinaryAngle | float, eps: float | None = None) -> list:
+        '''Углы на расстоянии не больше eps (по умолчанию - допуск индекса)'''
+        x = self._norm(angle)
+        return [item[1] for item in self._within(x, self._eps if eps is None else eps)]
+
+    def __contains__(self, angle: Angle | BinaryAngle | float) -> bool:
+        '''Есть ли в индексе угол, совпадающий с данным в пределах допуска'''
+        return next(self._within(self._norm(angle), self._eps), None) is not None
+
+    def add(self, angle: Angle | BinaryAngle | float) -> bool:
+        '''Добавляет угол, если в индексе нет близкого; возвращает True при добавлении'''
+        x = self._norm(angle)
+        if next(self._within(x, self._eps), None) is not None:
+            return False
+        key = self._bucket(x)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = []
+            bisect.insort(self._keys, key)
+        bucket.append((x, angle))
+        self._size += 1
+        return True
+
+    def discard(self, angle: Angle | BinaryAngle | float) -> int:
+        '''Удаляет все углы в пределах допуска, возвращает их число'''
+        x = self._norm(angle)
+        removed = 0
+        for item in list(self._within(x, self._eps)):
+            key = self._bucket(item[0])
+            bucket = self._buckets[key]
+            bucket.remove(item)
+            removed += 1
+            if not bucket:
+                del self._buckets[key]
+                self._keys.pop(bisect.bisect_left(self._keys, key))
+        self._size -= removed
+        return removed
+
+    def nearest(self, angle: Angle | BinaryAngle | float, k: int = 1) -> list:
+        '''k ближайших углов: обход непустых корзин от корзины запроса в обе стороны'''
+        if k <= 0 or not self._keys:
+            return []
+        x = self._norm(angle)
+        center = self._bucket(x)
+        n, keys = self._nbuckets, self._keys
+
+        best: list[tuple[float, int, object]] = []  # куча (-расстояние, порядковый номер, угол)
+        right = bisect.bisect_left(keys, center)
+        left = right - 1
+        order = 0
+        for _ in range(len(keys)):
+            # следующая корзина - ближайшая по номеру из двух направлений
+            r_key, l_key = keys[right % len(keys)], keys[left % len(keys)]
+            r_gap, l_gap = (r_key - center) % n, (center - l_key) % n
+            if r_gap <= l_gap:
+                key, gap = r_key, r_gap
+                right += 1
+            else:
+                key, gap = l_key, l_gap
+                left -= 1
+            # точки корзины на расстоянии gap не ближе (gap - 1) * ширина
+            if len(best) == k and -best[0][0] <= (gap - 1) * self._width:
+                break
+            for item_x, item in self._buckets[key]:
+                d = self._distance(item_x, x)
+                if len(best) < k:
+                    heapq.heappush(best, (-d, order, item))
+                elif d < -best[0][0]:
+                    heapq.heapreplace(best, (-d, order, item))
+                order += 1
+        return [item for _, _, item in sorted(best, key=lambda e: (-e[0], e[1]))]
+
+
 def test_angle():
     print("Тестирование класса Angle")
 
@@ -410,6 +1990,7 @@ def test_angle():
     print(f"a2 == a3? {a2 == a3}")
     print(f"a2 > a3? {a2 > a3}")
     print(f"a2 < a3? {a2 < a3}")
+    print(f"sorted([a1, a2, a3, 400°]) = {sorted([a1, a2, a3, Angle(400, radians=False)], key=Angle.sort_key)}")
 
     # Преобразование типов
     print(f"\nПреобразование типов данных")
@@ -418,6 +1999,60 @@ def test_angle():
     print(f"str(a2) = {str(a2)}")
     print(f"repr(a2) = {repr(a2)}")
 
+    # Тригонометрия
+    print(f"\nТригонометрия")
+    table = TrigTable(resolution=1024)
+    print(f"sin(a3) = {a3.sin():.6f}, cos(a3) = {a3.cos():.6f}")
+    print(f"sincos(a2) по таблице {table}: {tuple(round(v, 6) for v in a2.sincos(table))}")
+
+
+def test_angle_array():
+    print("\n\n\nТестирование класса AngleArray")
+
+    arr = AngleArray.from_degrees([0, 90, 180, 270, 450])
+    print(f"arr = {arr}")
+    print(f"arr в градусах: {[round(d, 1) for d in arr.degrees]}")
+    print(f"arr + 90°: {[round(d, 1) for d in (arr + Angle(90, radians=False)).degrees]}")
+    print(f"arr * 2: {[round(d, 1) for d in (arr * 2).degrees]}")
+    print(f"нормализованный arr: {[round(d, 1) for d in arr.normalized().degrees]}")
+    print(f"arr == 90°? {arr.equal(Angle(90, radians=False))}")
+    print(f"arr < 180°? {arr.less(Angle(180, radians=False))}")
+    print(f"arr[1] = {arr[1]}")
+    print(f"sin(arr): {[round(v, 4) for v in arr.sin()]}")
+    print(f"cos(arr) по таблице: {[round(v, 4) for v in arr.cos(TrigTable(1024))]}")
+    mixed = AngleArray([Angle(90, radians=False), 180], radians=False)
+    print(f"Angle(90°) и 180 в градусах: {[round(d, 1) for d in mixed.degrees]}")
+    assert [round(d, 6) for d in mixed.degrees] == [90, 180]
+    inverse = math.pi / AngleArray([math.pi / 2, math.pi])
+    print(f"π / arr: {[round(x, 4) for x in inverse.radians]}")
+    assert list(inverse.radians) == [(math.pi / Angle(x)).radians for x in (math.pi / 2, math.pi)]
+
+
+def test_binary_angle():
+    print("\n\n\nТестирование класса BinaryAngle")
+
+    b1 = BinaryAngle.from_degrees(270)
+    b2 = Angle(180, radians=False).to_binary()
+    print(f"b1 = {b1}")
+    print(f"b2 = {b2}")
+    print(f"b1 + b2 = {b1 + b2}")
+    print(f"b2 * 3 = {b2 * 3}")
+    print(f"b1 - b2 - b2 = {b1 - b2 - b2}")
+    print(f"b1 == -90°? {b1 == BinaryAngle.from_degrees(-90)}")
+    print(f"len({{b1, BinaryAngle.from_degrees(630)}}) = {len({b1, BinaryAngle.from_degrees(630)})}")
+    print(f"b1 в Angle: {b1.to_angle()}")
+
+
+def test_angle_hash_index():
+    print("\n\n\nТестирование класса AngleHashIndex")
+
+    index = AngleHashIndex(eps=1e-6)
+    for value in (0, 2 * math.pi, 1.0, 1.0 + 1e-9, 3.0, -1e-8):
+        print(f"add({value}) -> {index.add(value)}")
+    print(f"Уникальных углов: {len(index)}")
+    print(f"Углы в пределах 0.5 рад от 1.2: {index.find_within(1.2, 0.5)}")
+    print(f"2 ближайших к 6.0: {index.nearest(6.0, k=2)}")
+
 
 def test_angle_range():
     print("\n\n\n\n\nТестирование класса AngleRange")
@@ -472,6 +2107,65 @@ def test_angle_range():
     print(f"r2 - [70°,100°] = {diff_result}")
 
 
+def test_angle_range_set():
+    print("\n\nТестирование класса AngleRangeSet")
+
+    deg = lambda d: Angle(d, radians=False)
+    sectors = AngleRangeSet([AngleRange(deg(0), deg(60)), AngleRange(deg(30), deg(90), True, True),
+                             AngleRange(deg(300), deg(20))])
+    other = AngleRangeSet([AngleRange(deg(45), deg(180))])
+    print(f"sectors = {sectors}")
+    print(f"sectors | [45°,180°) = {sectors | other}")
+    print(f"sectors & [45°,180°) = {sectors & other}")
+    print(f"sectors - [45°,180°) = {sectors - other}")
+    print(f"~sectors = {~sectors}")
+    print(f"10° в sectors? {deg(10) in sectors}")
+    print(f"200° в sectors? {deg(200) in sectors}")
+    punctured = ~AngleRangeSet([AngleRange(deg(90), deg(90), True, True)])
+    print(f"Окружность без точки 90°: {punctured}, диапазонов: {len(punctured)}")
+
+    print("\nИндекс диапазонов AngleRangeIndex")
+    index = AngleRangeIndex([AngleRange(deg(0), deg(90)), AngleRange(deg(45), deg(135)),
+                             AngleRange(deg(270), deg(30))])
+    key = index.insert(AngleRange(deg(10), deg(20), True, True))
+    print(f"Диапазоны, содержащие 15°: {index.stab(deg(15))}")
+    index.remove(key)
+    print(f"После удаления [10°,20°]: {index.stab(deg(15))}")
+    print(f"Пересекаются с [100°,280°): {index.overlap(AngleRange(deg(100), deg(280)))}")
+
+    print("\nПотоковое объединение merge_range_stream")
+    stream = (AngleRange(deg(d), deg(d + 15)) for d in (350, 100, 0, 110, 200, 20))
+    for merged in merge_range_stream(stream, chunk_size=2):
+        print(f"  {merged}")
+    # Стык через 0 без одной точки: результат не должен схлопнуться в пустой диапазон
+    punctured = [AngleRange(deg(0), deg(90), True, False), AngleRange(deg(90), deg(0), False, True)]
+    print(f"  без точки 90°: {list(merge_range_stream(punctured, chunk_size=1))}")
+
+    print("\nСтатистика покрытия coverage_stats (4 сектора)")
+    stats = coverage_stats([AngleRange(deg(0), deg(120)), AngleRange(deg(60), deg(100)),
+                            AngleRange(deg(300), deg(30))], bins=4, workers=1)
+    print(f"Покрыто: {math.degrees(stats.covered):.1f}°, максимальная глубина: {stats.max_depth}")
+    print(f"Покрытие по секторам: {[round(math.degrees(c), 1) for c in stats.bin_covered]}")
+    print(f"Глубина по секторам: {stats.bin_max_depth}")
+    stats = coverage_stats([AngleRange(deg(0), deg(90), True, False), AngleRange(deg(90), deg(0), False, True)],
+                           bins=4, workers=1)
+    print(f"Окружность без точки 90°: покрыто {math.degrees(stats.covered):.1f}°")
+    # covered - точная мера объединения (как abs(AngleRangeSet)), без поправки AngleRange.__abs__ на концы
+    open_range = AngleRange(1.0, 2.0, False, False)
+    stats = coverage_stats([open_range], bins=4, workers=1)
+    assert stats.covered == 1.0 == abs(AngleRangeSet([open_range]))
+    assert abs(open_range) == 1.0 - 2 * FloatDivision
+
+    print("\nДвоичный каталог RangeCatalog")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sectors.bin")
+        count = write_range_catalog(path, [AngleRange(deg(d), deg(d + 40)) for d in range(0, 360, 30)])
+        with RangeCatalog(path) as catalog:
+            print(f"Записано {count} диапазонов, размер файла {os.path.getsize(path)} байт")
+            print(f"catalog[3] = {catalog[3]}")
+            print(f"Содержат 95°: {catalog.index().stab(deg(95))}")
+
+
 def test_edge_cases():
     print("\n\nКрайние случаи")
 
@@ -496,6 +2190,10 @@ def test_edge_cases():
 
 if __name__ == "__main__":
     test_angle()
+    test_angle_array()
+    test_binary_angle()
+    test_angle_hash_index()
     test_angle_range()
+    test_angle_range_set()
     test_edge_cases()
     print("Тестирование завершено")
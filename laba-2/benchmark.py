@@ -0,0 +1,150 @@
+'''
+Бенчмарк вывода Printer без TTY (лабораторная работа 2)
+
+Вывод идет в VirtualTerminal (разбор ANSI в модель экрана) или в пустой приемник, считающий байты.
+Для каждого шрифта, символа заполнения, цвета и режима выводится: глифов в секунду, байт и записей
+на кадр, задержка кадра (p50/p95) и проверка того, что на экране оказался ожидаемый текст.
+
+Режимы:
+    print   - Printer.print, каждый кадр одной записью
+    screen  - ScreenBuffer: кадры меняются незначительно, выводятся только изменения
+    scale2  - Printer.print с увеличением 2x
+
+Запуск:
+    python benchmark.py
+    python benchmark.py --frames 2000 --sink null --json out.json
+'''
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass
+
+from main import Color, FontLoader, Printer, ScreenBuffer, VirtualTerminal
+
+FONTS = ["font5x5.json", "font7x7.json", "font5x5.bfnt", "font7x7.bfnt"]
+SYMBOLS = ["*", "#", "█"]
+COLORS = [Color.RED, Color.BRIGHT_CYAN]
+MODES = ["print", "screen", "scale2"]
+TEXTS = ["HELLO WORLD", "HELLO WORLB", "HELLO WORLC"]  # соседние кадры отличаются одной буквой
+POSITION = (2, 3)
+
+
+class NullSink:
+    '''Приемник, который только считает записи и байты'''
+
+    encoding = "utf-8"
+
+    def __init__(self) -> None:
+        self.writes = 0
+        self.bytes_written = 0
+        self.buffer = self
+
+    def write(self, data: str | bytes) -> int:
+        self.writes += 1
+        self.bytes_written += len(data) if isinstance(data, bytes) else len(data.encode(self.encoding))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+@dataclass
+class Result:
+    font: str
+    symbol: str
+    color: str
+    mode: str
+    frames: int
+    glyphs_per_sec: float
+    bytes_per_frame: float
+    writes_per_frame: float
+    p50_us: float
+    p95_us: float
+    screen_ok: bool | None
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+def run(font: str, symbol: str, color: Color, mode: str, frames: int, sink_kind: str) -> Result:
+    scale = 2 if mode == "scale2" else 1
+    compiled = FontLoader.compile_font(font)
+    lines = compiled.render_lines(TEXTS[0], symbol, scale)
+    sink = VirtualTerminal(POSITION[0] + len(lines) + 1, POSITION[1] + len(lines[0]) + 1) \
+        if sink_kind == "vt" else NullSink()
+    screen = ScreenBuffer(len(lines), len(lines[0]), origin=POSITION) if mode == "screen" else None
+
+    latencies = []
+    glyphs = 0
+    start = time.perf_counter()
+    for i in range(frames):
+        text = TEXTS[i % len(TEXTS)]
+        begin = time.perf_counter()
+        if screen is not None:
+            screen.clear()
+            Printer.print(text, color, (1, 1), symbol, font, screen=screen)
+            screen.flush(sink)
+        else:
+            Printer.print(text, color, POSITION, symbol, font, scale=scale, stream=sink)
+        latencies.append(time.perf_counter() - begin)
+        glyphs += len(text)
+    elapsed = time.perf_counter() - start
+
+    screen_ok = None
+    if isinstance(sink, VirtualTerminal):  # на экране должен остаться последний кадр
+        expected = compiled.render_lines(TEXTS[(frames - 1) % len(TEXTS)], symbol, scale)
+        shown = sink.region(POSITION[0], POSITION[1], len(expected), len(expected[0]))
+        colors = {sink.cell(POSITION[0] + r, POSITION[1] + c)[1]
+                  for r, line in enumerate(expected) for c, ch in enumerate(line) if ch != " "}
+        screen_ok = shown == expected and colors <= {color}
+
+    return Result(font, symbol, color.name, mode, frames, glyphs / elapsed, sink.bytes_written / frames,
+                  sink.writes / frames, percentile(latencies, 50) * 1e6, percentile(latencies, 95) * 1e6, screen_ok)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк вывода Printer")
+    parser.add_argument("--frames", type=int, default=300, help="кадров на случай")
+    parser.add_argument("--sink", choices=["vt", "null"], default="vt",
+                        help="vt - VirtualTerminal с проверкой экрана, null - только подсчет байт")
+    parser.add_argument("--fonts", nargs="+", default=FONTS)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--json", help="сохранить результаты в JSON")
+    args = parser.parse_args(argv)
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))  # шрифты лежат рядом
+    results = []
+    for font in args.fonts:
+        for mode in args.modes:
+            # все сочетания символа и цвета - для основного режима, для остальных - одно
+            combos = [(s, c) for s in SYMBOLS for c in COLORS] if mode == "print" else [(SYMBOLS[0], COLORS[0])]
+            for symbol, color in combos:
+                results.append(run(font, symbol, color, mode, args.frames, args.sink))
+
+    print(f"{'шрифт':<14}{'симв':>5}{'цвет':>13}{'режим':>8}{'глиф/с':>11}{'байт/кадр':>11}"
+          f"{'запис/кадр':>11}{'p50 мкс':>9}{'p95 мкс':>9}{'экран':>7}")
+    for r in results:
+        ok = "-" if r.screen_ok is None else ("ok" if r.screen_ok else "ОШИБКА")
+        print(f"{r.font:<14}{r.symbol:>5}{r.color:>13}{r.mode:>8}{r.glyphs_per_sec:>11,.0f}{r.bytes_per_frame:>11.0f}"
+              f"{r.writes_per_frame:>11.1f}{r.p50_us:>9.1f}{r.p95_us:>9.1f}{ok:>7}")
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "sink": args.sink,
+            "results": [asdict(r) for r in results],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
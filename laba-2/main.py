@@ -31,16 +31,34 @@ with Printer(color: Color, position : Tuple[int, int], symbol: str) as printer:
 
 
 
+import asyncio
+import contextlib
+import functools
 import json
+import math
+import mmap
 import os
+import re
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
 from enum import Enum
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterator, List, Mapping, Tuple
 
 
 
 counting = 1
 indent = 4
 
+# Упакованный двоичный формат шрифта: заголовок, таблица глифов (по возрастанию кода символа), строки глифов.
+# Строка глифа - битовая маска шириной ceil(width / 8) байт (little-endian), старший бит - левый столбец.
+FONT_MAGIC = b"BFNT"
+FONT_VERSION = 1
+FONT_HEADER = struct.Struct("<4sHHHI")  # сигнатура, версия, высота, макс. ширина, число глифов
+FONT_ENTRY = struct.Struct("<IHI")      # код символа, ширина глифа, смещение строк от начала области данных
+
 
 class Color(Enum):
     '''Цвета (ANSI-коды)'''
@@ -62,6 +80,9 @@ class ANSI:
     RESET = "\033[0m"      # Сброс всех атрибутов (цвет, фони т.д.)
     SAVE_CURSOR = "\033[s"  # Сохранить текущую позицию курсора
     RESTORE_CURSOR = "\033[u" # Восстановить сохранённую позицию курсора
+    HIDE_CURSOR = "\033[?25l"  # Скрыть курсор
+    SHOW_CURSOR = "\033[?25h"  # Показать курсор
+    CLEAR_SCREEN = "\033[2J"   # Очистить экран
 
     @staticmethod
     def set_color(color: Color) -> str:
@@ -75,39 +96,507 @@ class ANSI:
 
 
 
+class EscapeBuilder:
+    '''Построитель потока ANSI в одном буфере: помнит позицию курсора и цвет, лишние команды не добавляет'''
+
+    UNKNOWN = object()  # состояние терминала неизвестно
+
+    def __init__(self, row: int | None = None, col: int | None = None, color: object = UNKNOWN):
+        self._parts: List[str] = []
+        self.row = row              #текущая позиция курсора (None - неизвестна)
+        self.col = col
+        self.color = color          #текущий цвет (None - цвет по умолчанию)
+
+    def move(self, row: int, col: int) -> "EscapeBuilder":
+        '''Перемещение курсора (если он уже там - ничего не добавляется)'''
+        if row != self.row or col != self.col:
+            self._parts.append(ANSI.set_position(row, col))
+            self.row, self.col = row, col
+        return self
+
+    def set_color(self, color: Color | None) -> "EscapeBuilder":
+        '''Смена цвета (None - сброс атрибутов)'''
+        if color != self.color:
+            self._parts.append(ANSI.set_color(color) if color else ANSI.RESET)
+            self.color = color
+        return self
+
+    def reset(self) -> "EscapeBuilder":
+        '''Сброс цвета к исходному'''
+        return self.set_color(None)
+
+    def text(self, text: str) -> "EscapeBuilder":
+        '''Текст без переводов строк; курсор сдвигается на его длину'''
+        self._parts.append(text)
+        if self.col is not None:
+            self.col += len(text)
+        return self
+
+    def raw(self, data: str) -> "EscapeBuilder":
+        '''Произвольные данные; позиция курсора после них считается неизвестной'''
+        self._parts.append(data)
+        self.row = self.col = None
+        return self
+
+    def lines(self, lines: List[str], position: Tuple[int, int], color: Color | None) -> "EscapeBuilder":
+        '''Строки псевдографики друг под другом начиная с позиции'''
+        start_row, start_col = position
+        self.set_color(color)
+        for i, line in enumerate(lines):
+            self.move(start_row + i, start_col).text(line)
+        return self
+
+    def getvalue(self) -> str:
+        '''Накопленный поток (со сбросом цвета в конце, если цвет был изменен)'''
+        data = "".join(self._parts)
+        if self.color is not None and self.color is not self.UNKNOWN:
+            data += ANSI.RESET
+        return data
+
+    def to_bytes(self, encoding: str = "utf-8") -> bytes:
+        return self.getvalue().encode(encoding, "replace")
+
+    def write(self, stream=None) -> int:
+        '''Выводит поток одной записью в байтовый буфер stdout; возвращает число байт'''
+        stream = stream if stream is not None else sys.stdout
+        return write_bytes(self.to_bytes(getattr(stream, "encoding", None) or "utf-8"), stream)
+
+
+def write_bytes(data: bytes, stream=None) -> int:
+    '''Одна запись в байтовый буфер потока (по умолчанию stdout); возвращает число байт'''
+    if not data:
+        return 0
+    stream = stream if stream is not None else sys.stdout
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None:  # поток без байтового буфера (например, StringIO)
+        stream.write(data.decode(getattr(stream, "encoding", None) or "utf-8"))
+        stream.flush()
+        return len(data)
+    stream.flush()  # сначала уже выведенный через print текст
+    buffer.write(data)
+    buffer.flush()
+    return len(data)
+
+
+
+def _row_bytes(width: int) -> int:
+    return (width + 7) // 8
+
+
+def _pack_glyph(pattern: List[str], width: int) -> bytes:
+    '''Строки шаблона в битовые маски (любой непробельный символ - закрашенная точка)'''
+    size = _row_bytes(width)
+    data = bytearray()
+    for line in pattern:
+        mask = 0
+        for c in range(width):
+            mask <<= 1
+            if c < len(line) and line[c] != " ":
+                mask |= 1
+        data += mask.to_bytes(size, "little")
+    return bytes(data)
+
+
+@functools.lru_cache(maxsize=None)
+def _mask_rows(width: int) -> List[str]:
+    '''Строки шаблона для всех однобайтовых масок ширины width (width <= 8)'''
+    return ["".join("*" if mask >> (width - 1 - c) & 1 else " " for c in range(width)) for mask in range(256)]
+
+
+def _unpack_glyph(data: bytes, offset: int, height: int, width: int) -> List[str]:
+    '''Строки шаблона глифа из упакованных данных (побайтно по таблицам масок)'''
+    size = _row_bytes(width)
+    if size == 0:
+        return [""] * height
+    lead = _mask_rows(width - 8 * (size - 1))  # старший байт - левые столбцы
+    if size == 1:
+        return [lead[mask] for mask in data[offset:offset + height]]
+    full = _mask_rows(8)
+    rows = []
+    for pos in range(offset, offset + height * size, size):
+        row = data[pos:pos + size]
+        rows.append(lead[row[-1]] + "".join([full[mask] for mask in reversed(row[:-1])]))
+    return rows
+
+
+
+class PackedFont(Mapping):
+    '''Шрифт в упакованном двоичном формате. При загрузке читается только заголовок: глиф ищется двоичным поиском
+    по таблице (она упорядочена по коду символа) и распаковывается при обращении, недавно использованные глифы
+    хранятся в LRU-кэше'''
+
+    _CODE = struct.Struct("<I")  # код символа в начале записи таблицы
+
+    def __init__(self, data: "bytes | mmap.mmap", cache_size: int = 256):
+        magic, version, height, width, count = FONT_HEADER.unpack_from(data)
+        if magic != FONT_MAGIC or version != FONT_VERSION:
+            raise ValueError(f"Неподдерживаемый формат шрифта: {magic!r}, версия {version}")
+        self.height = height        #высота глифов
+        self.width = width          #максимальная ширина глифа
+        self._data = data
+        self._count = count
+        self._base = FONT_HEADER.size + count * FONT_ENTRY.size  # начало строк глифов
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    @classmethod
+    def open(cls, filename: str, cache_size: int = 256) -> "PackedFont":
+        '''Шрифт из файла, отображенного в память (файл не читается целиком)'''
+        with open(filename, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(data, cache_size)
+
+    def close(self) -> None:
+        '''Освобождает отображение файла'''
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    @property
+    def closed(self) -> bool:
+        return isinstance(self._data, mmap.mmap) and self._data.closed
+
+    def _find(self, char: str) -> Tuple[int, int] | None:
+        '''(ширина, смещение строк) глифа или None, если символа нет в шрифте'''
+        if len(char) != 1:
+            return None
+        code = ord(char)
+        data, lo, hi = self._data, 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = FONT_HEADER.size + mid * FONT_ENTRY.size
+            mid_code = self._CODE.unpack_from(data, pos)[0]
+            if mid_code < code:
+                lo = mid + 1
+            elif mid_code > code:
+                hi = mid
+            else:
+                _, width, offset = FONT_ENTRY.unpack_from(data, pos)
+                return width, self._base + offset
+        return None
+
+    def __getitem__(self, char: str) -> List[str]:
+        cache = self._cache
+        rows = cache.get(char)
+        if rows is not None:
+            cache.move_to_end(char)
+            return rows
+        found = self._find(char) if isinstance(char, str) else None
+        if found is None:
+            raise KeyError(char)
+        rows = cache[char] = _unpack_glyph(self._data, found[1], self.height, found[0])
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+        return rows
+
+    def __contains__(self, char: object) -> bool:
+        return char in self._cache or (isinstance(char, str) and self._find(char) is not None)
+
+    def __iter__(self) -> Iterator[str]:
+        for pos in range(FONT_HEADER.size, self._base, FONT_ENTRY.size):
+            yield chr(self._CODE.unpack_from(self._data, pos)[0])
+
+    def __len__(self) -> int:
+        return self._count
+
+
+
 class FontLoader:
-    '''Загрузчик шрифтов из файлов'''
+    '''Загрузчик шрифтов из файлов (JSON или упакованный двоичный формат)'''
 
     @staticmethod
-    def load_font(filename: str) -> Dict[str, List[str]]:
+    def load_font(filename: str) -> Mapping[str, List[str]]:
         try:
-            with open(filename, "r", encoding="utf-8") as f:
-                font_data = json.load(f)
-
-            if not isinstance(font_data, dict):
-                raise ValueError("Неверный формат шрифта")
-
-            heights = {len(pattern) for pattern in font_data.values()}
-            if len(heights) > 1:
-                raise ValueError(f"Несовместимые высоты символов: {heights}")
+            with open(filename, "rb") as f:
+                data = f.read(len(FONT_MAGIC))
+                if data == FONT_MAGIC:  # двоичный шрифт читается по требованию
+                    return PackedFont.open(filename)
+                data += f.read()
 
+            font_data = json.loads(data.decode("utf-8"))
+            FontLoader._check_font(font_data)
             return font_data
 
         except Exception as e:
             print(f"Ошибка загрузки шрифта {filename}: {e}")
             return {}
 
+    @staticmethod
+    def _check_font(font_data: object) -> None:
+        '''Проверка формата шрифта (словарь символ -> строки одной высоты)'''
+        if not isinstance(font_data, Mapping):
+            raise ValueError("Неверный формат шрифта")
+
+        heights = {len(pattern) for pattern in font_data.values()}
+        if len(heights) > 1:
+            raise ValueError(f"Несовместимые высоты символов: {heights}")
+
+    @staticmethod
+    def save_binary(font: Mapping[str, List[str]], filename: str) -> None:
+        '''Сохраняет шрифт в упакованном двоичном формате'''
+        FontLoader._check_font(font)
+        if not font:
+            raise ValueError("Пустой шрифт")
+        height = len(next(iter(font.values())))
+        entries = bytearray()
+        glyphs = bytearray()
+        max_width = 0
+        for char in sorted(font):
+            if len(char) != 1:
+                raise ValueError(f"Ключ шрифта должен быть одним символом: {char!r}")
+            width = max((len(line) for line in font[char]), default=0)
+            max_width = max(max_width, width)
+            entries += FONT_ENTRY.pack(ord(char), width, len(glyphs))
+            glyphs += _pack_glyph(font[char], width)
+        # запись во временный файл и замена: уже отображенные в память версии шрифта остаются целыми
+        temp_file = filename + ".tmp"
+        with open(temp_file, "wb") as f:
+            f.write(FONT_HEADER.pack(FONT_MAGIC, FONT_VERSION, height, max_width, len(font)))
+            f.write(entries)
+            f.write(glyphs)
+        os.replace(temp_file, filename)
+
+    @staticmethod
+    def convert_json(json_file: str, binary_file: str | None = None) -> str:
+        '''Преобразует JSON-шрифт в двоичный (по умолчанию рядом, с расширением .bfnt); возвращает путь'''
+        with open(json_file, "r", encoding="utf-8") as f:
+            font = json.load(f)
+        if binary_file is None:
+            binary_file = os.path.splitext(json_file)[0] + ".bfnt"
+        FontLoader.save_binary(font, binary_file)
+        return binary_file
+
+    # Кэш скомпилированных шрифтов: (путь, время изменения файла) -> CompiledFont
+    _compiled: Dict[Tuple[str, int], "CompiledFont"] = {}
+
+    @classmethod
+    def compile_font(cls, filename: str) -> "CompiledFont | None":
+        '''Скомпилированный шрифт из кэша; файл перечитывается только после его изменения'''
+        try:
+            path = os.path.abspath(filename)
+            key = (path, os.stat(filename).st_mtime_ns)
+        except OSError:
+            key = None  # ошибку сообщит load_font
+        else:
+            compiled = cls._compiled.get(key)
+            if compiled is not None:
+                return compiled
+
+        font = cls.load_font(filename)
+        if not font:
+            return None
+        compiled = CompiledFont(font)
+        if key is not None:
+            for old_key in [k for k in cls._compiled if k[0] == path]:
+                cls._compiled.pop(old_key).close()  # устаревшие версии файла: освобождаем отображение
+            cls._compiled[key] = compiled
+        return compiled
+
+
+
+class CompiledFont:
+    '''Шрифт с заранее отрисованными строками глифов (лениво, для каждого символа заполнения)'''
+
+    def __init__(self, font: Mapping[str, List[str]]):
+        self.font = font
+        self.height = font.height if isinstance(font, PackedFont) else len(next(iter(font.values())))
+        self._glyphs: Dict[str, Dict[str, Tuple[str, ...]]] = {}  # symbol -> буква -> строки глифа
+        self._bitmaps: Dict[Tuple[str, int], Tuple[int, Tuple[bytes, ...]]] = {}  # (буква, масштаб) -> битовая карта
+
+    def close(self) -> None:
+        '''Закрывает упакованный шрифт (отображение файла); JSON-шрифт закрывать не нужно'''
+        if isinstance(self.font, PackedFont):
+            self.font.close()
+
+    @property
+    def closed(self) -> bool:
+        return isinstance(self.font, PackedFont) and self.font.closed
+
+    def glyph(self, char: str, symbol: str) -> Tuple[str, ...]:
+        '''Строки глифа буквы, нарисованного символом symbol (вместе с промежутком после буквы)'''
+        cache = self._glyphs.get(symbol)
+        if cache is None:
+            cache = self._glyphs[symbol] = {}
+        rows = cache.get(char)
+        if rows is None:
+            if char == " ":
+                rows = (" " * indent,) * self.height
+            elif char in self.font:
+                # строки разной длины дополняются пробелами до ширины глифа, иначе столбцы текста сдвигаются
+                pattern = self.font[char]
+                width = max((len(pat_line) for pat_line in pattern), default=0)
+                rows = tuple(pat_line.ljust(width).replace("*", symbol) + " " for pat_line in pattern)
+            else:  # Если символа нет в шрифте, пропускаем
+                rows = (" " * (self.height + counting),) * self.height
+            cache[char] = rows
+        return rows
+
+    def render_lines(self, text: str, symbol: str, scale: int = 1) -> List[str]:
+        '''Строки псевдографики для текста (по одной на строку шрифта; scale - целое увеличение)'''
+        if scale != 1:
+            return self.rasterize(text, scale).lines(symbol)
+        glyph = self.glyph
+        columns = [glyph(char, symbol) for char in text.upper()]
+        if not columns:
+            return [""] * self.height
+        return ["".join(row) for row in zip(*columns)]
+
+    def bitmap(self, char: str, scale: int = 1) -> Tuple[int, Tuple[bytes, ...]]:
+        '''Ширина и строки битовой карты глифа (байты 0/1 вместе с промежутком), растянутые по ширине в scale раз'''
+        key = (char, scale)
+        cached = self._bitmaps.get(key)
+        if cached is None:
+            if scale == 1:
+                rows = tuple(bytes(c != " " for c in line) for line in self.glyph(char, "*"))
+            else:
+                rows = tuple(bytes(b for b in row for _ in range(scale)) for row in self.bitmap(char)[1])
+            cached = self._bitmaps[key] = (len(rows[0]) if rows else 0, rows)
+        return cached
+
+    def rasterize(self, text: str, scale: int = 1) -> "Raster":
+        '''Растр текста за один проход: строки битовых карт глифов склеиваются в общий bytearray'''
+        if scale < 1:
+            raise ValueError(f"Масштаб должен быть натуральным числом: {scale}")
+        glyphs = [self.bitmap(char, scale) for char in text.upper()]
+        width = sum(glyph_width for glyph_width, _ in glyphs)
+        raster = Raster(self.height * scale, width)
+        if width:
+            # строки шрифта собираются склейкой строк битовых карт, по высоте каждая повторяется scale раз
+            rows = [b"".join(row) for row in zip(*(bitmap_rows for _, bitmap_rows in glyphs))]
+            raster.data[:] = b"".join([row for row in rows for _ in range(scale)])
+        return raster
+
+
+
+class Raster:
+    '''Двумерный растр псевдографики в bytearray (построчно; 1 - закрашенная точка, 0 - пробел)'''
+
+    _TO_TEXT = bytes.maketrans(b"\x00\x01", b" *")
+
+    def __init__(self, height: int, width: int):
+        self.height = height
+        self.width = width
+        self.data = bytearray(height * width)
+
+    def row(self, index: int) -> bytes:
+        '''Строка растра'''
+        return bytes(self.data[index * self.width:(index + 1) * self.width])
+
+    def lines(self, symbol: str = "*") -> List[str]:
+        '''Строки текста (закрашенные точки - символ symbol); одинаковые строки преобразуются один раз'''
+        if not self.width:
+            return [""] * self.height
+        lines: List[str] = []
+        previous, text = None, ""
+        for r in range(0, self.height * self.width, self.width):
+            row = self.data[r:r + self.width]
+            if row != previous:
+                text = row.translate(self._TO_TEXT).decode("ascii")
+                if symbol != "*":
+                    text = text.replace("*", symbol)
+                previous = row
+            lines.append(text)
+        return lines
+
+
+
+class ScreenBuffer:
+    '''Буфер кадра: сетка ячеек (символ, цвет); в терминал выводятся только изменившиеся ячейки'''
+
+    GAP = 4  # пропуск до GAP неизменных ячеек дешевле перепечатать, чем переставлять курсор
+
+    def __init__(self, rows: int, cols: int, origin: Tuple[int, int] = (1, 1)):
+        self.rows = rows            #размер буфера
+        self.cols = cols
+        self.origin = origin        #позиция левого верхнего угла буфера в терминале
+        self._chars = [[" "] * cols for _ in range(rows)]  # следующий кадр
+        self._colors: List[List[Color | None]] = [[None] * cols for _ in range(rows)]
+        self._shown_chars: List[List[str | None]] = []     # то, что сейчас на экране
+        self._shown_colors: List[List[Color | None]] = []
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        '''Содержимое терминала неизвестно: следующий flush перерисует все ячейки'''
+        self._shown_chars = [[None] * self.cols for _ in range(self.rows)]
+        self._shown_colors = [[None] * self.cols for _ in range(self.rows)]
+
+    def clear(self) -> None:
+        '''Очищает следующий кадр (на экране изменения появятся после flush)'''
+        for r in range(self.rows):
+            self._chars[r] = [" "] * self.cols
+            self._colors[r] = [None] * self.cols
+
+    def cell(self, row: int, col: int) -> Tuple[str, Color | None]:
+        '''Символ и цвет ячейки следующего кадра (координаты с 1)'''
+        return self._chars[row - 1][col - 1], self._colors[row - 1][col - 1]
+
+    def draw_text(self, row: int, col: int, text: str, color: Color | None = None) -> None:
+        '''Записывает строку в кадр начиная с (row, col); выходящая за буфер часть отсекается'''
+        r = row - 1
+        if not 0 <= r < self.rows:
+            return
+        c = col - 1
+        if c < 0:
+            text, c = text[-c:], 0
+        text = text[:self.cols - c]
+        if text:
+            end = c + len(text)
+            self._chars[r][c:end] = text
+            self._colors[r][c:end] = [color] * len(text)
+
+    def _build(self, out: EscapeBuilder | None = None) -> EscapeBuilder:
+        '''Поток ANSI для перехода от показанного кадра к следующему (добавляется в out)'''
+        out = out if out is not None else EscapeBuilder()
+        top, left = self.origin
+        for r in range(self.rows):
+            chars, colors = self._chars[r], self._colors[r]
+            shown_chars, shown_colors = self._shown_chars[r], self._shown_colors[r]
+            if chars == shown_chars and colors == shown_colors:
+                continue
+            row = top + r
+            for c in range(self.cols):
+                char, color = chars[c], colors[c]
+                if char == shown_chars[c] and color == shown_colors[c]:
+                    continue
+                if out.row == row:
+                    start = out.col - left
+                    if 0 < c - start <= self.GAP and all(colors[k] == out.color for k in range(start, c)):
+                        out.text("".join(chars[start:c]))  # дописываем неизменные ячейки
+                out.move(row, left + c).set_color(color).text(char)
+            shown_chars[:] = chars
+            shown_colors[:] = colors
+        return out
+
+    def draw_lines(self, lines: List[str], position: Tuple[int, int], color: Color | None = None) -> None:
+        '''Записывает строки друг под другом начиная с позиции'''
+        start_row, start_col = position
+        for i, line in enumerate(lines):
+            self.draw_text(start_row + i, start_col, line, color)
+
+    def render(self) -> str:
+        '''Последовательность ANSI для перехода от показанного кадра к следующему'''
+        return self._build().getvalue()
+
+    def flush(self, stream=None) -> int:
+        '''Выводит изменения кадра одной записью; возвращает число выведенных байт'''
+        return self._build().write(stream)
+
 
 
 class Printer:
     '''Класс для вывода текста'''
 
     def __init__(self, color: Color = Color.WHITE, position: Tuple[int, int] = (1, 1),
-                 symbol: str = "*", font_file: str | None = None):
+                 symbol: str = "*", font_file: str | None = None, screen: ScreenBuffer | None = None,
+                 scale: int = 1, stream=None):
         self.color = color          #цвет текста
         self.position = position    #начальная позиция
         self.symbol = symbol        #символ, которым заполняется псевдографика
-        self._font: Dict[str, List[str]] = {}
+        self.screen = screen        #буфер кадра (None - вывод сразу в терминал)
+        self.scale = scale          #целое увеличение псевдошрифта (2 - вдвое шире и выше)
+        self.stream = stream        #поток вывода (None - sys.stdout)
+        self._font: Mapping[str, List[str]] = {}
+        self._compiled: CompiledFont | None = None
+        self._font_file: str | None = None
         self._font_height: int = 0
         self._original_position: Tuple[int, int] | None = None
 
@@ -116,125 +605,804 @@ class Printer:
 
     def load_font(self, font_file: str) -> None:
         '''Загружает шрифт из файла'''
-        self._font = FontLoader.load_font(font_file)
-        if self._font:
-            first_char = next(iter(self._font.values()))
-            self._font_height = len(first_char)
+        self._font_file = font_file
+        self._compiled = FontLoader.compile_font(font_file)
+        if self._compiled:
+            self._font = self._compiled.font
+            self._font_height = self._compiled.height
+        else:
+            self._font = {}
 
     def __enter__(self) -> "Printer":
         '''Сохраняет текущую позицию курсора'''
-        print(ANSI.SAVE_CURSOR, end="")
+        if self.screen is None:
+            print(ANSI.SAVE_CURSOR, end="", file=self.stream)
         self._original_position = self.position
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         '''Восстанавливает курсор и сбрасывает цвет )при выходе из блока)'''
-        print(ANSI.RESET + ANSI.RESTORE_CURSOR, end="")
+        if self.screen is None:
+            print(ANSI.RESET + ANSI.RESTORE_CURSOR, end="", file=self.stream)
 
-    @classmethod
-    def print(cls, text: str, color: Color = Color.WHITE,
-              position: Tuple[int, int] = (1, 1), symbol: str = "*",
-              font_file: str | None = None) -> None:
-        '''Статический метод для однократного вывода текста'''
-        font: Dict[str, List[str]] = {}
-        font_height = 0
-
-        if font_file: # Попытка загрузить шрифт
-            font = FontLoader.load_font(font_file)
-            if font:
-                first_char = next(iter(font.values()))
-                font_height = len(first_char)
+    @staticmethod
+    def _emit(lines: List[str], position: Tuple[int, int], color: Color,
+              screen: ScreenBuffer | None = None, out: EscapeBuilder | None = None, stream=None) -> None:
+        '''Выводит строки псевдографики с позиции: в буфер кадра, в построитель out или одной записью в поток'''
+        if screen is not None:
+            screen.draw_lines(lines, position, color)
+        elif out is not None:
+            out.lines(lines, position, color)
+        else:
+            EscapeBuilder().lines(lines, position, color).write(stream)
 
+    @classmethod
+    def render(cls, text: str, color: Color = Color.WHITE,
+               position: Tuple[int, int] = (1, 1), symbol: str = "*",
+               font_file: str | None = None, scale: int = 1, out: EscapeBuilder | None = None) -> EscapeBuilder:
+        '''Добавляет поток ANSI для текста в out (или в новый построитель) без вывода'''
+        out = out if out is not None else EscapeBuilder()
+        font = FontLoader.compile_font(font_file) if font_file else None
         if not font:  #Шрифт не загружен — обычный текст
-            print(ANSI.set_position(*position) + ANSI.set_color(color) +
-                  text + ANSI.RESET)
-            return
+            out.move(*position).set_color(color).text(text).reset().raw("\n")
+            return out
+        return out.lines(font.render_lines(text, symbol, scale), position, color)
 
-        lines = [""] * font_height  #Подготовка строк псевдографики
+    @classmethod
+    def render_many(cls, items: List[Tuple], out: EscapeBuilder | None = None) -> EscapeBuilder:
+        '''Поток для нескольких текстов в одном буфере; элемент - аргументы render (text, color, position, symbol, font_file, scale)'''
+        out = out if out is not None else EscapeBuilder()
+        for item in items:
+            cls.render(*item, out=out)
+        return out
 
-        for char in text.upper(): # Обработка каждого символа входного текста
-            if char == " ":
-                for i in range(font_height):
-                    lines[i] += " " * indent
-                continue
+    @classmethod
+    def print_many(cls, items: List[Tuple], stream=None) -> int:
+        '''Выводит несколько текстов одной записью; возвращает число байт'''
+        return cls.render_many(items).write(stream)
 
-            if char in font:
-                pattern = font[char]
-                for i, pat_line in enumerate(pattern):
-                    rendered = pat_line.replace("*", symbol) #Заменяем * на заданный символ
-                    lines[i] += rendered + " "
-            else:  #Если символа нет в шрифте, пропускаем
-                for i in range(font_height):
-                    lines[i] += " " * (font_height + counting )
+    @classmethod
+    def print(cls, text: str, color: Color = Color.WHITE,
+              position: Tuple[int, int] = (1, 1), symbol: str = "*",
+              font_file: str | None = None, screen: ScreenBuffer | None = None, scale: int = 1,
+              stream=None) -> None:
+        '''Статический метод для однократного вывода текста (screen - буфер кадра вместо терминала, scale - увеличение,
+        stream - поток вывода вместо sys.stdout)'''
+        if screen is None:
+            cls.render(text, color, position, symbol, font_file, scale).write(stream)
+            return
 
-        start_row, start_col = position  #Вывод по строкам
-        for i, line in enumerate(lines):
-            print(ANSI.set_position(start_row + i, start_col) +
-                  ANSI.set_color(color) + line + ANSI.RESET, end="")
+        font = FontLoader.compile_font(font_file) if font_file else None  # Попытка загрузить шрифт
+        if not font:  #Шрифт не загружен — обычный текст
+            screen.draw_text(*position, text, color)
+            return
+        cls._emit(font.render_lines(text, symbol, scale), position, color, screen)
 
-    def print_text(self, text: str, position: Tuple[int, int] | None = None) -> None:
-        '''Вывод текста с использованием настроек экземпляра'''
+    def print_text(self, text: str, position: Tuple[int, int] | None = None,
+                   out: EscapeBuilder | None = None) -> None:
+        '''Вывод текста с использованием настроек экземпляра (out - добавить в построитель без вывода)'''
         if not self._font:
             print("Ошибка, шрифт не загружен")
             return
         
         pos = position if position is not None else self.position
+        if self._compiled.closed:  # файл шрифта изменился, кэш закрыл старую версию
+            self.load_font(self._font_file)
+            if not self._font:
+                print("Ошибка, шрифт не загружен")
+                return
 
-        lines = [""] * self._font_height
-
-        for char in text.upper():
-            if char == " ":
-                for i in range(self._font_height):
-                    lines[i] += " " * indent
-                continue
-
-            if char in self._font: 
-                pattern = self._font[char]
-                for i, pat_line in enumerate(pattern):
-                    rendered = pat_line.replace("*", self.symbol)
-                    lines[i] += rendered + " "
-            else:
-                for i in range(self._font_height):
-                    lines[i] += " " * (self._font_height + counting )
+        lines = self._compiled.render_lines(text, self.symbol, self.scale)
+        self._emit(lines, pos, self.color, self.screen, out, self.stream)
 
         start_row, start_col = pos
-        for i, line in enumerate(lines):
-            print(ANSI.set_position(start_row + i, start_col) +
-                  ANSI.set_color(self.color) + line + ANSI.RESET, end="")
 
         if position is None:
-            self.position = (start_row + self._font_height + counting , start_col)
+            self.position = (start_row + self._font_height * self.scale + counting , start_col)
 
 
-def demonstrate() -> None:
-    '''Демонстрация работы Printer'''
-    os.system("cls" if os.name == "nt" else "clear")
+class AnimationStats:
+    '''Статистика анимации: достигнутая частота кадров, время кадра (перцентили) и пропущенные кадры'''
+
+    def __init__(self, frame_times: List[float], dropped: int, elapsed: float, target_fps: float):
+        self.frame_times = frame_times  #время отрисовки и вывода каждого показанного кадра, с
+        self.dropped = dropped          #кадры, время которых прошло до того, как их успели показать
+        self.elapsed = elapsed          #длительность анимации, с
+        self.target_fps = target_fps
+
+    @property
+    def frames(self) -> int:
+        '''Число показанных кадров'''
+        return len(self.frame_times)
+
+    @property
+    def fps(self) -> float:
+        '''Достигнутая частота кадров'''
+        return self.frames / self.elapsed if self.elapsed > 0 else 0.0
+
+    def percentile(self, p: float) -> float:
+        '''Перцентиль времени кадра (p от 0 до 100), с'''
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        rank = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def __str__(self) -> str:
+        return (f"{self.fps:.1f} кадр/с (цель {self.target_fps:g}), кадров {self.frames}, пропущено {self.dropped}, "
+                f"время кадра p50 {self.percentile(50) * 1e3:.2f} мс, p95 {self.percentile(95) * 1e3:.2f} мс, "
+                f"p99 {self.percentile(99) * 1e3:.2f} мс")
+
+
+
+class Animation:
+    '''Показ кадров с заданной частотой. Срок кадра i - start + i / fps (от начала, а не от конца предыдущего
+    кадра), поэтому ошибки sleep не накапливаются; если срок следующих кадров уже прошел, они пропускаются'''
+
+    def __init__(self, fps: float = 30.0, clock: Callable[[], float] = time.perf_counter,
+                 sleep: Callable[[float], None] = time.sleep):
+        if fps <= 0:
+            raise ValueError(f"Частота кадров должна быть положительной: {fps}")
+        self.fps = fps
+        self._clock = clock
+        self._sleep = sleep
+
+    def run(self, frame: Callable[[int], None], frames: int) -> AnimationStats:
+        '''Показывает кадры 0..frames-1 (frame получает номер кадра на шкале времени); возвращает статистику'''
+        period = 1.0 / self.fps
+        clock = self._clock
+        frame_times: List[float] = []
+        dropped = 0
+        index = 0
+        start = clock()
+        while index < frames:
+            deadline = start + index * period
+            now = clock()
+            if now < deadline:
+                self._sleep(deadline - now)
+            elif now - deadline >= period:  # опоздали больше чем на кадр: показываем актуальный
+                missed = min(int((now - deadline) / period), frames - 1 - index)
+                dropped += missed
+                index += missed
+            begin = clock()
+            frame(index)
+            frame_times.append(clock() - begin)
+            index += 1
+        elapsed = max(clock() - start, frames * period)  # последний кадр показан до конца своего периода
+        return AnimationStats(frame_times, dropped, elapsed, self.fps)
+
+
+
+class Marquee:
+    '''Бегущая строка: текст отрисовывается один раз в полосу, кадр - окно (срез) полосы шириной width'''
+
+    def __init__(self, text: str, width: int, color: Color = Color.WHITE, position: Tuple[int, int] = (1, 1),
+                 symbol: str = "*", font_file: str | None = None, scale: int = 1,
+                 screen: ScreenBuffer | None = None, stream=None):
+        font = FontLoader.compile_font(font_file) if font_file else None
+        if font:
+            lines = font.render_lines(text + " ", symbol, scale)
+        else:  #Шрифт не загружен — обычный текст
+            lines = [text + " "]
+        self.width = width          #ширина окна
+        self.color = color
+        self.position = position
+        self.screen = screen        #буфер кадра (None - вывод сразу в терминал)
+        self.stream = stream        #поток вывода (None - sys.stdout)
+        self.period = len(lines[0]) if lines else 0  # сдвиг, после которого кадры повторяются
+        repeat = -(-width // self.period) + 1 if self.period else 0
+        self._strips = [line * repeat for line in lines]  # полосы, из которых окно вырезается без переноса
+
+    def frame_lines(self, offset: int) -> List[str]:
+        '''Строки кадра со сдвигом offset символов'''
+        start = offset % self.period if self.period else 0
+        end = start + self.width
+        return [strip[start:end] for strip in self._strips]
+
+    def show(self, offset: int) -> None:
+        '''Выводит кадр (в буфер кадра с выводом изменений или одной записью в терминал)'''
+        lines = self.frame_lines(offset)
+        if self.screen is not None:
+            Printer._emit(lines, self.position, self.color, self.screen)
+            self.screen.flush(self.stream)
+        else:
+            EscapeBuilder().lines(lines, self.position, self.color).write(self.stream)
+
+    def run(self, fps: float = 30.0, seconds: float = 5.0, step: int = 1) -> AnimationStats:
+        '''Прокрутка в течение seconds секунд со сдвигом step символов за кадр'''
+        return Animation(fps).run(lambda index: self.show(index * step), round(seconds * fps))
+
+
+
+class _SyncStreamWriter:
+    '''Замена asyncio.StreamWriter для потоков, которые нельзя подключить к циклу событий (файлы, StringIO)'''
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, data: bytes) -> None:
+        write_bytes(data, self._stream)
+
+    async def drain(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _ThreadStreamWriter:
+    '''Писатель для терминала: запись выполняется в рабочем потоке, цикл событий ждет ее в drain.
+    Дескриптор остается блокирующим, поэтому обычный print в других частях программы работает как прежде'''
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> None:
+        self._chunks.append(data)
+
+    async def drain(self) -> None:
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks.clear()
+            await asyncio.get_running_loop().run_in_executor(None, write_bytes, data, self._stream)
+
+    def close(self) -> None:
+        pass
+
+
+async def open_terminal_writer(stream=None, pipe: bool = False
+                               ) -> "asyncio.StreamWriter | _ThreadStreamWriter | _SyncStreamWriter":
+    '''Писатель для терминала в цикле событий: по умолчанию запись в рабочем потоке; pipe=True - неблокирующий
+    транспорт цикла событий на копии дескриптора (дескриптор становится неблокирующим для всего процесса, пока
+    писатель не закрыт close_terminal_writer). Для потоков без дескриптора - синхронная запись'''
+    stream = stream if stream is not None else sys.stdout
+    try:
+        fd = stream.fileno()
+    except (AttributeError, OSError, ValueError):
+        return _SyncStreamWriter(stream)
+    if not pipe:
+        return _ThreadStreamWriter(stream)
+    stream.flush()
+    loop = asyncio.get_running_loop()
+    pipe = os.fdopen(os.dup(fd), "wb", buffering=0)  # копия дескриптора: закрытие писателя не закроет stdout
+    try:
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, pipe)
+    except (ValueError, NotImplementedError, OSError):  # обычный файл или платформа без поддержки
+        pipe.close()
+        return _SyncStreamWriter(stream)
+    return asyncio.StreamWriter(transport, protocol, None, loop)
+
+
+async def close_terminal_writer(writer: "asyncio.StreamWriter | _SyncStreamWriter") -> None:
+    '''Закрывает писатель из open_terminal_writer и возвращает дескриптору блокирующий режим'''
+    if isinstance(writer, (_SyncStreamWriter, _ThreadStreamWriter)):
+        return
+    fd = writer.transport.get_extra_info("pipe").fileno()
+    try:
+        os.set_blocking(fd, True)  # режим общий для копий дескриптора, в том числе для stdout
+    finally:
+        writer.close()
+        await asyncio.sleep(0)
+
+
+
+class AsyncPrinter:
+    '''Асинхронный Printer: кадр рендерится в вызывающей задаче и ставится в очередь задачи-писателя.
+    Еще не выведенный кадр для той же позиции заменяется новым, поэтому медленный терминал получает только
+    актуальные кадры, а производители не ждут вывода'''
+
+    def __init__(self, color: Color = Color.WHITE, position: Tuple[int, int] = (1, 1),
+                 symbol: str = "*", font_file: str | None = None, scale: int = 1,
+                 writer: "asyncio.StreamWriter | None" = None, max_pending: int = 64, stream=None,
+                 pipe: bool = False):
+        self._printer = Printer(color, position, symbol, font_file, scale=scale)
+        self._writer = writer           #None - писатель для stream (по умолчанию stdout) создается в start
+        self._own_writer = writer is None
+        self._stream = stream
+        self._pipe = pipe               #True - неблокирующий транспорт вместо записи в рабочем потоке (см. open_terminal_writer)
+        self._encoding = getattr(stream if stream is not None else sys.stdout, "encoding", None) or "utf-8"
+        self._max_pending = max_pending  #кадров в очереди, после которых производители ждут
+        self._pending: Dict[Tuple[int, int], bytes] = {}  # позиция -> последний кадр (в порядке поступления)
+        self._wakeup = asyncio.Event()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._task: "asyncio.Task | None" = None
+        self._closing = False
+        self._in_flight = False         #пачка кадров передана писателю, но еще не выведена
+        self._error: BaseException | None = None  # ошибка записи, на которой остановилась задача-писатель
+        self.frames_written = 0         #кадров выведено
+        self.frames_coalesced = 0       #кадров заменено более новыми до вывода
+        self.bytes_written = 0
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        return self._printer.position
+
+    async def start(self) -> "AsyncPrinter":
+        '''Запускает задачу-писателя'''
+        if self._writer is None:
+            self._writer = await open_terminal_writer(self._stream, self._pipe)
+        self._task = asyncio.create_task(self._write_loop())
+        return self
+
+    async def __aenter__(self) -> "AsyncPrinter":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        try:
+            await self.aclose()
+        except Exception:
+            if exc_type is None:  # не заменяем исключение из тела with
+                raise
+
+    async def _wait_space(self, key: Tuple[int, int]) -> None:
+        '''Ожидание места в очереди (кадр, заменяющий ожидающий, место не занимает)'''
+        while len(self._pending) >= self._max_pending and key not in self._pending:
+            self._check_error()
+            self._drained.clear()
+            await self._drained.wait()
+        self._check_error()
+
+    def _check_error(self) -> None:
+        '''Пробрасывает ошибку записи производителям'''
+        if self._error is not None:
+            raise self._error
+
+    def _submit(self, key: Tuple[int, int], data: bytes) -> None:
+        self._check_error()
+        if self._closing:
+            raise RuntimeError("AsyncPrinter закрыт")
+        if self._pending.pop(key, None) is not None:
+            self.frames_coalesced += 1
+        self._pending[key] = data
+        self._drained.clear()
+        self._wakeup.set()
+
+    async def print_text(self, text: str, position: Tuple[int, int] | None = None) -> None:
+        '''Рендерит текст с настройками экземпляра и ставит кадр в очередь'''
+        key = position if position is not None else self._printer.position
+        await self._wait_space(key)
+        out = EscapeBuilder()
+        self._printer.print_text(text, position, out=out)
+        self._submit(key, out.to_bytes(self._encoding))
+
+    async def print(self, text: str, color: Color = Color.WHITE, position: Tuple[int, int] = (1, 1),
+                    symbol: str = "*", font_file: str | None = None, scale: int = 1) -> None:
+        '''Как Printer.print, но через очередь задачи-писателя'''
+        await self._wait_space(position)
+        self._submit(position, Printer.render(text, color, position, symbol, font_file, scale).to_bytes(self._encoding))
+
+    async def flush(self) -> None:
+        '''Ожидание вывода всех кадров из очереди, в том числе уже переданных писателю'''
+        while self._pending or self._in_flight:
+            self._check_error()
+            await self._drained.wait()
+        self._check_error()
+
+    async def _write_loop(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pending:
+                frames = list(self._pending.values())
+                self._pending.clear()
+                batch = b"".join(frames)
+                self._in_flight = True
+                try:
+                    self._writer.write(batch)
+                    await self._writer.drain()  # пока терминал занят, новые кадры копятся и заменяют друг друга
+                except Exception as exc:
+                    self._error = exc
+                    self._in_flight = False
+                    self._drained.set()  # ожидающие проснутся и получат ошибку
+                    return
+                self._in_flight = False
+                self.frames_written += len(frames)
+                self.bytes_written += len(batch)
+            if not self._pending:
+                self._drained.set()
+                if self._closing:
+                    return
+
+    async def aclose(self) -> None:
+        '''Выводит оставшиеся кадры и останавливает задачу-писателя'''
+        if self._task is None:
+            return
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        if self._own_writer:
+            await close_terminal_writer(self._writer)
+            self._writer = None
+        self._check_error()
+
+
+
+class Region(ScreenBuffer):
+    '''Область терминала, выделенная компоновщиком: буфер кадра с отсечением по границам области.
+    Рисование защищено блокировкой области, на экран изменения выводит компоновщик'''
+
+    def __init__(self, compositor: "Compositor", top: int, left: int, rows: int, cols: int):
+        self.lock = threading.RLock()
+        self._compositor = compositor
+        super().__init__(rows, cols, origin=(top, left))
+
+    def draw_text(self, row: int, col: int, text: str, color: Color | None = None) -> None:
+        with self.lock:
+            super().draw_text(row, col, text, color)
+        self._compositor.schedule()
+
+    def draw_lines(self, lines: List[str], position: Tuple[int, int], color: Color | None = None) -> None:
+        with self.lock:  # строки одного текста попадают в один кадр
+            super().draw_lines(lines, position, color)
+        self._compositor.schedule()
+
+    def clear(self) -> None:
+        with self.lock:
+            super().clear()
+        self._compositor.schedule()
+
+    @contextlib.contextmanager
+    def frame(self, clear: bool = True) -> Iterator["Region"]:
+        '''Атомарное обновление области: компоновщик не выведет промежуточное состояние (например, после clear)'''
+        with self.lock:
+            if clear:
+                ScreenBuffer.clear(self)
+            yield self
+        self._compositor.schedule()
+
+    def printer(self, color: Color = Color.WHITE, position: Tuple[int, int] = (1, 1), symbol: str = "*",
+                font_file: str | None = None, scale: int = 1) -> Printer:
+        '''Printer, рисующий в эту область (позиция - внутри области)'''
+        return Printer(color, position, symbol, font_file, screen=self, scale=scale)
+
+    def flush(self, stream=None) -> int:
+        '''Вывод только через компоновщик (вместе с остальными областями)'''
+        return self._compositor.refresh()
+
+
+
+class Compositor:
+    '''Владелец терминала: раздает непересекающиеся области (Region), собирает их изменения под блокировкой
+    в один кадр и выводит его одной записью. Фоновый планировщик выводит кадры не чаще fps раз в секунду,
+    поэтому производители только рисуют в память, а обновления разных областей объединяются'''
+
+    def __init__(self, fps: float = 30.0, stream=None):
+        if fps <= 0:
+            raise ValueError(f"Частота кадров должна быть положительной: {fps}")
+        self.fps = fps
+        self._stream = stream           #None - sys.stdout
+        self._regions: List[Region] = []
+        self._lock = threading.Lock()   #один кадр выводится целиком
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.frames_written = 0
+        self.bytes_written = 0
+
+    def region(self, top: int, left: int, rows: int, cols: int) -> Region:
+        '''Новая область с левым верхним углом (top, left) в координатах терминала'''
+        with self._lock:  # проверка пересечений и добавление - одна операция для всех потоков
+            for other in self._regions:
+                other_top, other_left = other.origin
+                if (top < other_top + other.rows and other_top < top + rows and
+                        left < other_left + other.cols and other_left < left + cols):
+                    raise ValueError(f"Область ({top}, {left}, {rows}x{cols}) пересекается с {other.origin}")
+            region = Region(self, top, left, rows, cols)
+            self._regions.append(region)
+        return region
+
+    def schedule(self) -> None:
+        '''Отмечает, что есть изменения для вывода'''
+        self._dirty.set()
+
+    def refresh(self) -> int:
+        '''Собирает изменения всех областей в один кадр и выводит его; возвращает число байт'''
+        with self._lock:
+            out = EscapeBuilder()
+            for region in self._regions:
+                with region.lock:
+                    region._build(out)
+            written = out.write(self._stream)
+            if written:
+                self.frames_written += 1
+                self.bytes_written += written
+            return written
+
+    def _run(self) -> None:
+        period = 1.0 / self.fps
+        while True:
+            self._dirty.wait()
+            if self._stop.is_set():
+                return
+            self._dirty.clear()
+            start = time.perf_counter()
+            self.refresh()
+            self._stop.wait(period - (time.perf_counter() - start))  # изменения за это время войдут в следующий кадр
+
+    def start(self) -> "Compositor":
+        '''Скрывает курсор и запускает фоновый вывод кадров'''
+        write_bytes(ANSI.HIDE_CURSOR.encode(), self._stream)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="compositor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        '''Останавливает фоновый вывод, выводит последние изменения и показывает курсор'''
+        if self._thread is not None:
+            self._stop.set()
+            self._dirty.set()
+            self._thread.join()
+            self._thread = None
+        self.refresh()
+        write_bytes(ANSI.SHOW_CURSOR.encode(), self._stream)
+
+    def __enter__(self) -> "Compositor":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+
+
+class _TerminalBuffer:
+    '''Байтовый интерфейс VirtualTerminal (как sys.stdout.buffer) для write_bytes'''
+
+    def __init__(self, terminal: "VirtualTerminal"):
+        self._terminal = terminal
+
+    def write(self, data: bytes) -> int:
+        self._terminal.writes += 1
+        self._terminal.bytes_written += len(data)
+        self._terminal.feed(data.decode(self._terminal.encoding))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+
+class VirtualTerminal:
+    '''Терминал без TTY: разбирает поток ANSI (позиция курсора, цвета SGR, сохранение курсора, очистка экрана)
+    в модель экрана в памяти. Подставляется вместо sys.stdout (параметр stream или redirect_stdout);
+    текст, выходящий за правый край, отсекается'''
+
+    # Байты по ECMA-48: CSI (параметры 0x30-0x3F, промежуточные 0x20-0x2F, финальный 0x40-0x7E);
+    # незавершенная последовательность в конце записи; ESC с промежуточными и финальным байтом (ESC 7, ESC ( B);
+    # одиночный ESC; \r и \n; текст
+    _TOKEN = re.compile(r"\033\[([0-?]*)[ -/]*([@-~])|(\033(?:\[[0-?]*)?[ -/]*)\Z|\033([ -/]*[0-~])|(\033)"
+                        r"|([\r\n])|([^\033\r\n]+)")
+    _COLORS = {color.value: color for color in Color}
+
+    def __init__(self, rows: int = 100, cols: int = 200, encoding: str = "utf-8"):
+        self.rows = rows
+        self.cols = cols
+        self.encoding = encoding
+        self.buffer = _TerminalBuffer(self)
+        self.writes = 0             #число записей (аналог системных вызовов write)
+        self.bytes_written = 0
+        self.reset()
+
+    def reset(self) -> None:
+        '''Пустой экран, курсор в (1, 1), цвет по умолчанию'''
+        self._chars = [[" "] * self.cols for _ in range(self.rows)]
+        self._colors: List[List[Color | None]] = [[None] * self.cols for _ in range(self.rows)]
+        self.row, self.col = 1, 1   #позиция курсора
+        self.color: Color | None = None
+        self.cursor_visible = True
+        self._saved = (1, 1)
+        self._tail = ""             #незавершенная escape-последовательность из прошлой записи
+
+    # Интерфейс текстового потока
+    def write(self, text: str) -> int:
+        self.writes += 1
+        self.bytes_written += len(text.encode(self.encoding, "replace"))
+        self.feed(text)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def feed(self, text: str) -> None:
+        '''Разбор очередной порции потока'''
+        text = self._tail + text
+        self._tail = ""
+        for match in self._TOKEN.finditer(text):
+            params, command, partial, escape, _, control, run = match.groups()
+            if run is not None:
+                self._put(run)
+            elif command is not None:
+                self._command(params, command)
+            elif control == "\n":
+                self.row, self.col = self.row + 1, 1
+            elif control == "\r":
+                self.col = 1
+            elif partial is not None:  # последовательность оборвана концом записи
+                self._tail = partial
+            elif escape == "7":  # DECSC / DECRC - сохранение и восстановление курсора
+                self._saved = (self.row, self.col)
+            elif escape == "8":
+                self.row, self.col = self._saved
+            # прочие двухбайтовые последовательности и одиночный ESC (например, ESC[ с недопустимым
+            # символом) пропускаются, а не копятся в _tail
+
+    def _put(self, run: str) -> None:
+        r, c = self.row - 1, self.col - 1
+        self.col += len(run)
+        if not 0 <= r < self.rows or c >= self.cols:
+            return
+        if c < 0:
+            run, c = run[-c:], 0
+        run = run[:self.cols - c]
+        self._chars[r][c:c + len(run)] = run
+        self._colors[r][c:c + len(run)] = [self.color] * len(run)
+
+    def _command(self, params: str, command: str) -> None:
+        if params[:1] in ("<", "=", ">", "?"):  # приватные параметры: поддерживается только видимость курсора
+            if command in "hl" and params == "?25":
+                self.cursor_visible = command == "h"
+            return
+        if command == "H":
+            parts = params.split(";") if params else []
+            self.row = int(parts[0]) if parts and parts[0] else 1
+            self.col = int(parts[1]) if len(parts) > 1 and parts[1] else 1
+        elif command == "m":
+            for code in (int(p) if p else 0 for p in params.split(";")):
+                if code == 0 or code == 39:
+                    self.color = None
+                elif code in self._COLORS:
+                    self.color = self._COLORS[code]
+        elif command == "s":
+            self._saved = (self.row, self.col)
+        elif command == "u":
+            self.row, self.col = self._saved
+        elif command == "J" and params == "2":
+            colors, cursor = self.color, (self.row, self.col)
+            self.reset()
+            self.color, (self.row, self.col) = colors, cursor
+
+    # Чтение модели экрана
+    def cell(self, row: int, col: int) -> Tuple[str, Color | None]:
+        '''Символ и цвет ячейки (координаты с 1)'''
+        return self._chars[row - 1][col - 1], self._colors[row - 1][col - 1]
+
+    def line(self, row: int) -> str:
+        '''Строка экрана без пробелов в конце'''
+        return "".join(self._chars[row - 1]).rstrip()
+
+    def region(self, row: int, col: int, rows: int, cols: int) -> List[str]:
+        '''Прямоугольный фрагмент экрана'''
+        return ["".join(self._chars[r][col - 1:col - 1 + cols]) for r in range(row - 1, row - 1 + rows)]
+
+    def text(self) -> str:
+        '''Весь экран без пустых строк в конце'''
+        return "\n".join(self.line(r) for r in range(1, self.rows + 1)).rstrip("\n")
+
+
+
+async def demonstrate_async(position: Tuple[int, int], delay: float = 0.2) -> None:
+    '''Две задачи-производителя выводят кадры через общий AsyncPrinter'''
+    row, col = position
+
+    async def producer(printer: AsyncPrinter, words: Tuple[str, ...], pos: Tuple[int, int], color: Color) -> None:
+        for word in words * 6:
+            await printer.print(word, color, pos, "#", "font5x5.bfnt")
+            await asyncio.sleep(delay)
+
+    async with AsyncPrinter() as printer:
+        await asyncio.gather(producer(printer, ("TICK", "TACK"), (row, col), Color.BRIGHT_GREEN),
+                             producer(printer, ("PING", "PONG"), (row + 6, col), Color.BRIGHT_YELLOW))
+
+
+def demonstrate(interactive: bool = True, stream=None) -> None:
+    '''Демонстрация работы Printer (interactive=False - без ожидания ввода и задержек, stream - поток вывода)'''
+    if stream is not None:
+        with contextlib.redirect_stdout(stream):
+            return demonstrate(interactive)
+
+    def pause() -> None:
+        if interactive:
+            input(" ")
+
+    if interactive:
+        os.system("cls" if os.name == "nt" else "clear")
+    else:
+        print(ANSI.set_position(1, 1) + ANSI.CLEAR_SCREEN, end="")
 
     print("Демонстрация работы PRINTER\n")
 
     # 1.Статический вывод со шрифтом 5x5
     Printer.print("HELLO", Color.YELLOW, (3, 5), "@", "font5x5.json")
     Printer.print("WORLD", Color.GREEN, (9, 5), "#", "font5x5.json")
-    input(" ")
+    pause()
 
     # 2.Контекстный менеджер (5x5)
     with Printer(Color.MAGENTA, (15, 5), "$", "font5x5.json") as p:
         p.print_text("HELLO")
         p.print_text("WORLD")
-    input(" ")
+    pause()
 
     # 3.Статический вывод (7x7)
     Printer.print("HELLO", Color.BRIGHT_YELLOW, (27, 5), "%", "font7x7.json")
     Printer.print("WORLD", Color.BRIGHT_CYAN, (35, 5), "^", "font7x7.json")
-    input(" ")
+    pause()
 
-    # 4.Контекстный менеджер (7x7)
-    with Printer(Color.RED, (43, 5), "#", "font7x7.json") as p:
+    # 4.Контекстный менеджер (7x7, упакованный двоичный шрифт)
+    with Printer(Color.RED, (43, 5), "#", "font7x7.bfnt") as p:
         p.print_text("HELLO")
-    input(" ")
+    pause()
+
+    # 5.Увеличенный псевдошрифт (2x)
+    Printer.print("BIG", Color.BRIGHT_MAGENTA, (51, 5), "@", "font5x5.bfnt", scale=2)
+    pause()
+
+    # 6.Буфер кадра: при смене кадра выводятся только изменившиеся ячейки
+    screen = ScreenBuffer(5, 60, origin=(62, 5))
+    for word in ("TICK", "TACK") * 5:
+        screen.clear()
+        Printer.print(word, Color.BRIGHT_GREEN, (1, 1), "#", "font5x5.json", screen=screen)
+        screen.flush()
+        time.sleep(0.3 if interactive else 0)
+    pause()
+
+    # 7.Бегущая строка с заданной частотой кадров
+    marquee = Marquee("HELLO WORLD", 60, Color.BRIGHT_CYAN, (69, 5), "#", "font5x5.bfnt")
+    stats = marquee.run(fps=20, seconds=3 if interactive else 0.2)
+    print(ANSI.set_position(75, 5) + str(stats))
+    pause()
+
+    # 8.Асинхронный вывод: несколько задач делят один терминал
+    asyncio.run(demonstrate_async((77, 5), 0.2 if interactive else 0))
+    pause()
+
+    # 9.Компоновщик: потоки рисуют каждый в свою область, кадры выводятся одной записью
+    words = ("ONE", "TWO", "SIX")
+    with Compositor(fps=20) as compositor:
+        def worker(index: int) -> None:
+            region = compositor.region(91 + index * 6, 5, 5, 40)
+            with region.printer(list(Color)[index], (1, 1), "#", "font5x5.bfnt") as printer:
+                for step in range(12):
+                    with region.frame():
+                        printer.print_text(words[(index + step) % len(words)], (1, 1))
+                    time.sleep((0.1 + index * 0.05) if interactive else 0)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    pause()
+
+
+    print(ANSI.set_position(110, 1))
+
 
+def check_rendering() -> None:
+    '''Проверка растеризатора: увеличенный растр совпадает с увеличенными строками render_lines
+    (для шрифтов из файлов и для шрифта со строками разной длины)'''
+    uneven = {"A": [" * ", "* *", "***", "* *", "* *"], "I": ["*", "*", "*", "*", "**"]}
+    fonts = [CompiledFont(uneven)] + [FontLoader.compile_font(name) for name in
+                                      ("font5x5.json", "font7x7.json", "font5x5.bfnt", "font7x7.bfnt")]
+    for font in fonts:
+        for text in ("AI", "IA I", "HELLO WORLD", ""):
+            base = font.render_lines(text, "*")
+            for scale in (1, 2, 3):
+                raster = font.rasterize(text, scale)
+                expected = ["".join(ch * scale for ch in line) for line in base for _ in range(scale)]
+                assert len(raster.data) == raster.width * raster.height, (text, scale)
+                assert raster.lines("*") == expected, (text, scale)
+                assert font.render_lines(text, "#", scale) == [line.replace("*", "#") for line in expected]
+    print("Проверка растеризатора пройдена")
 
-    print(ANSI.set_position(55, 1))
 
 if __name__ == "__main__":
-    demonstrate()
\ No newline at end of file
+    if len(sys.argv) > 2 and sys.argv[1] == "convert":  # python main.py convert font5x5.json [...]
+        for name in sys.argv[2:]:
+            print(f"{name} -> {FontLoader.convert_json(name)}")
+    elif len(sys.argv) > 1 and sys.argv[1] == "check":  # python main.py check
+        check_rendering()
+    else:
+        demonstrate(interactive="--no-wait" not in sys.argv)
\ No newline at end of file
@@ -49,13 +49,21 @@
 
 from __future__ import annotations
 import abc
+import collections
 import enum
+import gzip
+import io
+import lzma
 import re
+import shutil
 import socket
 import datetime
+import queue
 import sys
 import os
-from typing import List, Optional, Union
+import threading
+import time
+from typing import Callable, List, Optional, Union
 
 
 
@@ -169,6 +177,103 @@ class OrderedHandler(ILogHandler):
         self._buffer.clear()  # очистка буфера
 
 
+class OverflowPolicy(enum.Enum):
+    '''Что делать, когда очередь QueueHandler заполнена'''
+    BLOCK = 'block'  # ждать освобождения места
+    DROP_OLDEST = 'drop_oldest'  # выбросить самое старое сообщение из очереди
+    DROP_NEWEST = 'drop_newest'  # выбросить новое сообщение
+
+
+class QueueHandler(ILogHandler):
+    '''Передает сообщения обработчику через очередь, обработка в фоновых потоках'''
+
+    _STOP = object()  # сигнал остановки для рабочего потока
+
+    def __init__(self, target_handler: ILogHandler, max_size: int = 1000,
+                 policy: OverflowPolicy = OverflowPolicy.BLOCK, workers: int = 1) -> None:
+        # при workers > 1 порядок сообщений не гарантируется
+        self._target = target_handler
+        self._queue = queue.Queue(max_size)
+        self._policy = policy
+        self._lock = threading.Lock()  # постановка в очередь и закрытие не пересекаются
+        self._stats_lock = threading.Lock()  # счетчики (рабочие потоки берут только ее)
+        self._closed = False
+        self.dropped = 0  # выброшено при переполнении
+        self.errors = 0  # исключений в обработчике
+        self._workers = [threading.Thread(target=self._work, name=f'QueueHandler-{i}', daemon=True)
+                         for i in range(workers)]
+        for t in self._workers:
+            t.start()
+
+    def handle(self, log_level: LogLevel, text: str) -> None:
+        '''Кладет сообщение в очередь согласно политике переполнения; после close() сообщения не принимаются'''
+        record = (log_level, text)
+        with self._lock:
+            if self._closed:
+                return
+            if self._policy is OverflowPolicy.BLOCK:
+                self._queue.put(record)
+            elif self._policy is OverflowPolicy.DROP_NEWEST:
+                try:
+                    self._queue.put_nowait(record)
+                except queue.Full:
+                    self._count_dropped()
+            else:
+                while True:
+                    try:
+                        self._queue.put_nowait(record)
+                        break
+                    except queue.Full:
+                        try:
+                            self._queue.get_nowait()
+                            self._queue.task_done()
+                            self._count_dropped()
+                        except queue.Empty:
+                            pass
+
+    def _count_dropped(self) -> None:
+        with self._stats_lock:
+            self.dropped += 1
+
+    def _work(self) -> None:
+        '''Рабочий поток: передает сообщения обработчику, ошибки не останавливают поток'''
+        while True:
+            record = self._queue.get()
+            try:
+                if record is self._STOP:
+                    return
+                self._target.handle(*record)
+            except Exception:
+                with self._stats_lock:
+                    self.errors += 1
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        '''Ждет обработки всех сообщений в очереди, затем сбрасывает обработчик'''
+        self._queue.join()
+        flush = getattr(self._target, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self) -> None:
+        '''Обрабатывает оставшиеся сообщения, останавливает потоки и закрывает обработчик'''
+        with self._lock:  # идущий handle() успеет поставить сообщение до сигналов остановки
+            if self._closed:
+                return
+            self._closed = True
+        for _ in self._workers:
+            self._queue.put(self._STOP)
+        for t in self._workers:
+            t.join()
+        flush = getattr(self._target, 'flush', None)
+        if flush is not None:
+            flush()
+        close = getattr(self._target, 'close', None)
+        if close is not None:
+            close()
+
+
 # ОБРАБОТЧИКИ
 class ConsoleHandler(ILogHandler):
     '''Вывод логов в консоль (stdout)'''
@@ -195,6 +300,143 @@ class FileHandler(ILogHandler):
             f.write(text + '\n')
 
 
+class _Ticker:
+    '''Фоновый поток, вызывающий action каждые interval секунд до stop()'''
+
+    def __init__(self, interval: float, action, name: str) -> None:
+        self._interval = interval
+        self._action = action
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self._interval):
+            try:
+                self._action()
+            except Exception:
+                pass  # ошибка одного тика не останавливает таймер
+
+    def stop(self) -> None:
+        '''Останавливает поток и ждет завершения текущего вызова'''
+        self._stopped.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+class BufferedFileHandler(FileHandler):
+    '''Запись логов в постоянно открытый файл с буфером и ротацией'''
+
+    # важность уровней: буфер сбрасывается сразу для flush_level и более важных
+    _SEVERITY = {LogLevel.INFO: 0, LogLevel.WARN: 1, LogLevel.ERROR: 2}
+
+    # расширение архива для каждого способа сжатия
+    _COMPRESSORS = {'gzip': ('.gz', gzip.open), 'lzma': ('.xz', lzma.open)}
+
+    def __init__(self, filename: str, mode: str = 'a', encoding: str = 'utf-8',
+                 buffer_size: int = 64 * 1024, flush_interval: float = 1.0,
+                 flush_level: Optional[LogLevel] = LogLevel.ERROR,
+                 max_bytes: int = 0, rotate_interval: float = 0, backup_count: int = 5,
+                 compress: Optional[str] = None) -> None:
+        # max_bytes / rotate_interval = 0 - ротация отключена; backup_count = 0 - тоже
+        # (как в logging.handlers.RotatingFileHandler, файл не обрезается); compress: None, 'gzip' или 'lzma'
+        super().__init__(filename, mode, encoding)
+        if compress is not None and compress not in self._COMPRESSORS:
+            raise ValueError(f"Неизвестный способ сжатия: {compress}")
+        self._buffer_size = buffer_size
+        self._flush_level = flush_level
+        self._max_bytes = max_bytes
+        self._rotate_interval = rotate_interval
+        self._backup_count = backup_count
+        self._compress = compress
+        self._lock = threading.Lock()
+        self._compressor = None  # фоновый поток сжатия последнего архива
+        self._file = None
+        self._open()
+        # буфер сбрасывается по таймеру, даже если новых сообщений нет
+        self._ticker = _Ticker(flush_interval, self.flush, 'BufferedFileHandler-flush') if flush_interval > 0 else None
+
+    def _open(self) -> None:
+        '''Открывает файл, запоминает текущий размер и время следующей ротации'''
+        self._file = open(self._filename, self._mode, encoding=self._encoding, buffering=self._buffer_size)
+        self._size = self._file.tell()
+        self._rotate_at = time.time() + self._rotate_interval if self._rotate_interval else None
+
+    def handle(self, log_level: LogLevel, text: str) -> None:
+        '''Дописывает сообщение в буфер, при необходимости сбрасывает и ротирует файл'''
+        line = text + '\n'
+        size = len(line.encode(self._encoding))
+        with self._lock:
+            if self._file is None:
+                return
+            if self._need_rotate(size):
+                self._rotate()
+            self._file.write(line)
+            self._size += size
+            if self._flush_level is not None and self._SEVERITY[log_level] >= self._SEVERITY[self._flush_level]:
+                self._file.flush()
+
+    def _need_rotate(self, size: int) -> bool:
+        '''Пора ли начинать новый файл (по размеру или по времени)'''
+        if self._backup_count <= 0:
+            return False
+        if self._max_bytes and self._size and self._size + size > self._max_bytes:
+            return True
+        return self._rotate_at is not None and time.time() >= self._rotate_at
+
+    def _backup_name(self, index: int) -> str:
+        '''Имя архивной копии с номером index'''
+        ext = self._COMPRESSORS[self._compress][0] if self._compress else ''
+        return f"{self._filename}.{index}{ext}"
+
+    def _rotate(self) -> None:
+        '''Закрывает файл, сдвигает архивы .1 -> .2 -> ..., открывает новый файл'''
+        self._file.close()
+        if self._compressor is not None:  # предыдущий архив должен быть дожат до сдвига
+            self._compressor.join()
+            self._compressor = None
+        for i in range(self._backup_count - 1, 0, -1):
+            if os.path.exists(self._backup_name(i)):
+                os.replace(self._backup_name(i), self._backup_name(i + 1))
+        if self._compress:
+            raw = f"{self._filename}.1.tmp"
+            os.replace(self._filename, raw)
+            self._compressor = threading.Thread(target=self._compress_file,
+                                                args=(raw, self._backup_name(1)), daemon=True)
+            self._compressor.start()
+        else:
+            os.replace(self._filename, self._backup_name(1))
+        self._mode = 'w'
+        self._open()
+
+    def _compress_file(self, source: str, target: str) -> None:
+        '''Сжимает source в target (фоновый поток), исходный файл удаляется'''
+        opener = self._COMPRESSORS[self._compress][1]
+        with open(source, 'rb') as src, opener(target + '.tmp', 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(target + '.tmp', target)
+        os.remove(source)
+
+    def flush(self) -> None:
+        '''Записывает буфер на диск'''
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self) -> None:
+        '''Останавливает таймер, сбрасывает буфер, закрывает файл и ждет окончания сжатия'''
+        if self._ticker is not None:
+            self._ticker.stop()  # вне блокировки: тик сам берет ее в flush()
+            self._ticker = None
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._compressor is not None:
+                self._compressor.join()
+                self._compressor = None
+
+
 class SocketHandler(ILogHandler):
     '''Отправка через UDP-сокет'''
 
@@ -235,27 +477,175 @@ class SyslogHandler(ILogHandler):
 
 
 class FtpHandler(ILogHandler):
-    '''Отправка логов на FTP-сервер'''
-
-    def __init__(self, host: str, username: str, password: str, remote_path: str) -> None:
+    '''Отправка логов на FTP-сервер пачками через одно соединение.
+    Сеть используется только в фоновом потоке отправки (и в явных flush()/close()), handle() не блокируется'''
+
+    def __init__(self, host: str, username: str, password: str, remote_path: str,
+                 port: int = 21, batch_size: int = 64 * 1024, batch_interval: float = 5.0,
+                 spool_dir: Optional[str] = None, max_pending: int = 16 * 1024 * 1024, timeout: float = 10.0,
+                 ftp_factory: Optional[Callable[[], object]] = None) -> None:
+        # ftp_factory - создает несоединенный объект с интерфейсом ftplib.FTP (для подмены в тестах)
+        # max_pending - предел байт неотправленных пачек в памяти, при превышении выбрасываются самые старые
+        # (с spool_dir пачки, которые не удалось отправить, уходят на диск и в предел не входят)
         self._host = host
+        self._port = port
         self._username = username
         self._password = password
         self._remote_path = remote_path
+        self._batch_size = batch_size
+        self._batch_interval = batch_interval
+        self._spool_dir = spool_dir
+        self._max_pending = max_pending
+        self._timeout = timeout
+        self._ftp_factory = ftp_factory
+        self._ftp = None  # текущая сессия (только под _io_lock)
+        self._buffer = io.BytesIO()  # накопленные сообщения
+        self._pending = collections.deque()  # закрытые пачки в очереди на отправку
+        self._pending_bytes = 0
+        self._lock = threading.Lock()  # буфер и очередь пачек
+        self._io_lock = threading.Lock()  # отправка: одна за раз
+        self._wakeup = threading.Event()
+        self._closed = False
+        self.uploads = 0  # успешных команд APPE
+        self.dropped = 0  # сообщений, выброшенных из-за предела max_pending
+        if spool_dir is not None:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name='FtpHandler-upload', daemon=True)
+        self._thread.start()
 
     def handle(self, log_level: LogLevel, text: str) -> None:
-        '''Устанавливает FTP-соединение, дописывает сообщение'''
-        try:
-            import ftplib
-            with ftplib.FTP(self._host) as ftp:  # Создаём временный файл с сообщением
-                ftp.login(self._username, self._password)
-                with open('temp_log.txt', 'w') as tmp:  # Подключаемся к FTP
-                    tmp.write(text + '\n')
-                with open('temp_log.txt', 'rb') as f:  # Открываем временный файл и передаём его в удалённый
-                    ftp.storbinary(f'APPE {self._remote_path}', f)
-                os.remove('temp_log.txt')  # Удаляем временный файл
-        except Exception:
-            pass
+        '''Добавляет сообщение в пачку; полную пачку передает потоку отправки'''
+        with self._lock:
+            self._buffer.write((text + '\n').encode('utf-8'))
+            if self._buffer.tell() >= self._batch_size:
+                self._seal()
+                self._wakeup.set()
+
+    def _seal(self) -> None:
+        '''Закрывает текущую пачку и ставит ее в очередь (под _lock)'''
+        data = self._buffer.getvalue()
+        if not data:
+            return
+        self._buffer = io.BytesIO()
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        while self._pending_bytes > self._max_pending and len(self._pending) > 1:
+            oldest = self._pending.popleft()  # сервер долго недоступен: теряем самое старое
+            self._pending_bytes -= len(oldest)
+            self.dropped += oldest.count(b'\n')
+
+    def _run(self) -> None:
+        '''Поток отправки: просыпается по заполнению пачки или раз в batch_interval'''
+        while not self._closed:
+            self._wakeup.wait(self._batch_interval if self._batch_interval > 0 else None)
+            self._wakeup.clear()
+            if self._closed:
+                return
+            try:
+                self._drain()
+            except Exception:
+                pass  # ошибки диска при сохранении пачек не останавливают поток
+
+    def _connect(self):
+        '''Возвращает открытую сессию, при необходимости подключается заново'''
+        if self._ftp is None:
+            if self._ftp_factory is not None:
+                ftp = self._ftp_factory()
+            else:
+                import ftplib
+                ftp = ftplib.FTP(timeout=self._timeout)
+            ftp.connect(self._host, self._port)
+            ftp.login(self._username, self._password)
+            self._ftp = ftp
+        return self._ftp
+
+    def _disconnect(self) -> None:
+        '''Закрывает сессию, не обращая внимания на ошибки'''
+        if self._ftp is not None:
+            try:
+                self._ftp.quit()
+            except Exception:
+                try:
+                    self._ftp.close()
+                except Exception:
+                    pass
+            self._ftp = None
+
+    def _send(self, data: bytes) -> bool:
+        '''Дописывает data в удаленный файл; при обрыве переподключается и пробует еще раз'''
+        for _ in range(2):
+            try:
+                self._connect().storbinary(f'APPE {self._remote_path}', io.BytesIO(data))
+                self.uploads += 1
+                return True
+            except Exception:
+                self._disconnect()
+        return False
+
+    def _spooled(self) -> List[str]:
+        '''Файлы неотправленных пачек в порядке создания'''
+        if self._spool_dir is None:
+            return []
+        return sorted(os.path.join(self._spool_dir, name) for name in os.listdir(self._spool_dir)
+                      if name.endswith('.batch'))
+
+    def _spool(self, data: bytes) -> None:
+        '''Сохраняет неотправленную пачку на диск для повторной попытки'''
+        name = os.path.join(self._spool_dir, f"{time.time_ns():020d}-{os.getpid()}.batch")
+        with open(name + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(name + '.tmp', name)
+
+    def _drain(self) -> None:
+        '''Закрывает текущую пачку и отправляет сначала пачки с диска, затем очередь (по порядку).
+        При недоступности сервера очередь переносится на диск (если задан spool_dir) или остается в памяти'''
+        with self._lock:
+            self._seal()
+        with self._io_lock:
+            for name in self._spooled():
+                with open(name, 'rb') as f:
+                    if not self._send(f.read()):
+                        self._spool_pending()
+                        return
+                os.remove(name)
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        return
+                    data = self._pending[0]
+                if not self._send(data):  # сеть - вне _lock, handle() не ждет
+                    self._spool_pending()
+                    return
+                with self._lock:
+                    if self._pending and self._pending[0] is data:
+                        self._pending.popleft()
+                        self._pending_bytes -= len(data)
+
+    def _spool_pending(self) -> None:
+        '''Переносит очередь пачек на диск (без spool_dir пачки ждут в памяти в пределах max_pending)'''
+        if self._spool_dir is None:
+            return
+        with self._lock:
+            batches = list(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+        for data in batches:
+            self._spool(data)
+
+    def flush(self) -> None:
+        '''Отправляет накопленные сообщения сразу (в вызывающем потоке)'''
+        self._drain()
+
+    def close(self) -> None:
+        '''Останавливает поток отправки, отправляет остаток и закрывает сессию'''
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self._drain()
+        with self._io_lock:
+            self._disconnect()
 
 
 # ФОРМАТТЕРЫ
@@ -312,6 +702,26 @@ class Logger:
         '''Логирование с уровнем ERROR'''
         self.log(LogLevel.ERROR, text)
 
+    def flush(self) -> None:
+        '''Сбрасывает обработчики, у которых есть flush (для QueueHandler - ждет очередь)'''
+        for h in self._handlers:
+            flush = getattr(h, 'flush', None)
+            if flush is not None:
+                flush()
+
+    def close(self) -> None:
+        '''Закрывает обработчики, у которых есть close, остальные сбрасывает'''
+        for h in self._handlers:
+            close = getattr(h, 'close', None) or getattr(h, 'flush', None)
+            if close is not None:
+                close()
+
+    def __enter__(self) -> 'Logger':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
 
 def demo_logger():
     print("1.Запись в консоль и файл:")
@@ -394,10 +804,130 @@ def demo_logger():
     logger_timeonly.log_info("Только время")
     print()
 
+    print("9. Фоновые обработчики: медленный не задерживает быстрый")
+    class SlowHandler(ILogHandler):
+        '''Имитация медленного приемника (сеть, FTP)'''
+
+        def handle(self, log_level: LogLevel, text: str) -> None:
+            time.sleep(0.05)
+
+    slow = QueueHandler(SlowHandler(), max_size=5, policy=OverflowPolicy.DROP_OLDEST)
+    with Logger(formatters=[DefaultFormatter()],
+                handlers=[QueueHandler(ConsoleHandler()), slow]) as logger_async:
+        start = time.perf_counter()
+        for i in range(20):
+            logger_async.log_info(f"Фоновое сообщение {i}")
+        spent = time.perf_counter() - start
+        logger_async.flush()
+    print(f"   → 20 сообщений за {spent * 1000:.1f} мс, выброшено медленным обработчиком: {slow.dropped}")
+    print()
+
+    print("10. Буферизованный файл с ротацией по размеру и сжатием архивов")
+    with Logger(formatters=[DefaultFormatter()],
+                handlers=[BufferedFileHandler('rotating_demo.log', mode='w', max_bytes=2048,
+                                              backup_count=3, compress='gzip')]) as logger_file:
+        for i in range(200):
+            logger_file.log_info(f"Сообщение в файл {i}")
+        logger_file.log_error("Ошибка сбрасывается на диск сразу")
+    print("   → Проверьте rotating_demo.log и архивы rotating_demo.log.1.gz ... .3.gz\n")
+
+    print("11. FTP пачками через одно соединение (заглушка вместо сервера)")
+
+    class StubFtp:
+        '''Заглушка ftplib.FTP: хранит загруженные данные в памяти'''
+        files = {}
+        connections = 0
+
+        def connect(self, host, port):
+            StubFtp.connections += 1
+
+        def login(self, user, password):
+            pass
+
+        def storbinary(self, cmd, fp):
+            path = cmd.split(' ', 1)[1]
+            StubFtp.files[path] = StubFtp.files.get(path, b'') + fp.read()
+
+        def quit(self):
+            pass
+
+    ftp_handler = FtpHandler('localhost', 'user', 'password', 'logs/app.log',
+                             batch_size=512, ftp_factory=StubFtp)
+    with Logger(formatters=[DefaultFormatter()], handlers=[ftp_handler]) as logger_ftp:
+        for i in range(100):
+            logger_ftp.log_info(f"Сообщение на FTP {i}")
+    lines = StubFtp.files['logs/app.log'].decode('utf-8').count('\n')
+    print(f"   → {lines} сообщений, загрузок: {ftp_handler.uploads}, соединений: {StubFtp.connections}")
+    print()
+
     Logger().log_info("Нет обработчиков → ничего не выведется")
     Logger(handlers=[ConsoleHandler()]).log_info("Только обработчик")
     print()
 
 
+def check_handlers() -> None:
+    '''Проверки обработчиков (запуск: python main.py check)'''
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        # сообщение важнее flush_level сразу попадает на диск, менее важное остается в буфере
+        path = os.path.join(tmp, 'flush.log')
+        handler = BufferedFileHandler(path, flush_interval=0, flush_level=LogLevel.WARN)
+        handler.handle(LogLevel.INFO, 'info')
+        assert os.path.getsize(path) == 0
+        handler.handle(LogLevel.ERROR, 'error')
+        assert open(path, encoding='utf-8').read() == 'info\nerror\n'
+        handler.close()
+
+        # FtpHandler: handle() не ждет сеть; без spool_dir очередь ограничена; после сбоя порядок сохраняется
+        class FlakyFtp:
+            '''Заглушка ftplib.FTP, которая может "зависать" при подключении'''
+            up = False
+            data = b''
+
+            def connect(self, host, port):
+                if not FlakyFtp.up:
+                    time.sleep(0.2)
+                    raise OSError('timeout')
+
+            def login(self, user, password):
+                pass
+
+            def storbinary(self, cmd, fp):
+                FlakyFtp.data += fp.read()
+
+            def quit(self):
+                pass
+
+        ftp = FtpHandler('localhost', 'user', 'password', 'app.log', batch_size=10, batch_interval=0.05,
+                         max_pending=100, ftp_factory=FlakyFtp)
+        start = time.perf_counter()
+        for i in range(200):
+            ftp.handle(LogLevel.INFO, f'record {i:03d}')
+        assert time.perf_counter() - start < 0.1, "handle() ждал сервер"
+        time.sleep(0.3)
+        assert ftp._pending_bytes <= 100 and ftp.dropped > 0
+        FlakyFtp.up = True
+        ftp.close()
+        lines = FlakyFtp.data.decode('utf-8').splitlines()
+        assert lines == sorted(lines) and lines[-1] == 'record 199' and len(lines) + ftp.dropped == 200
+
+        FlakyFtp.up, FlakyFtp.data = False, b''
+        spool = os.path.join(tmp, 'spool')
+        ftp = FtpHandler('localhost', 'user', 'password', 'app.log', batch_size=10, batch_interval=0,
+                         spool_dir=spool, ftp_factory=FlakyFtp)
+        for i in range(5):
+            ftp.handle(LogLevel.INFO, f'record {i:03d}')
+        ftp.flush()
+        assert len(os.listdir(spool)) == 5 and FlakyFtp.data == b''
+        FlakyFtp.up = True
+        ftp.close()
+        assert FlakyFtp.data.decode('utf-8').splitlines() == [f'record {i:03d}' for i in range(5)]
+        assert os.listdir(spool) == []
+    print("Проверка обработчиков пройдена")
+
+
 if __name__ == "__main__":
-    demo_logger()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "check":
+        check_handlers()
+    else:
+        demo_logger()
\ No newline at end of file